@@ -0,0 +1,326 @@
+"""
+TrustBuddy AI - HTTP API
+
+A dependency-free ASGI application that serves the text, URL and
+deepfake analyses as JSON, using the same engines and result cache as the
+Streamlit app. It keeps no session state, so it scales horizontally: run
+one process per core behind any load balancer.
+
+    uvicorn api:app --host 0.0.0.0 --port 8000 --workers 4
+
+    POST /v1/text    {"text": "...", "mode": "FULL SPECTRUM ANALYSIS"}
+    POST /v1/url     {"url": "..."} or {"urls": ["...", ...]}
+    POST /v1/image   raw image bytes; ?filename=...&mode=full|metadata&early_exit=1
+    GET  /healthz    liveness / readiness, engine versions, queue depth
+    GET  /metrics    Prometheus stage and request counters
+"""
+import asyncio
+import json
+import os
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs
+
+import bulk_text
+import cache
+import config
+import forensics
+import instrumentation
+import phash
+import scoring
+import text_analysis
+import url_reputation
+
+DEFAULT_TEXT_MODE = "FULL SPECTRUM ANALYSIS"
+MAX_BATCH_URLS = 1000
+IMAGE_CONTENT_TYPES = ('image/', 'application/octet-stream')
+
+
+class HTTPError(Exception):
+    """Turned into a JSON error response with this status"""
+
+    def __init__(self, status, message, headers=()):
+        super().__init__(message)
+        self.status = status
+        self.headers = list(headers)
+
+
+class Limiter:
+    """Caps the analyses of one kind running at once and the queue in front of them.
+
+    Up to `limit` requests run and up to `queue` more wait, each for at
+    most `timeout` seconds. Anything beyond that is refused straight away
+    with 503 + Retry-After, so an overloaded instance sheds load to its
+    peers instead of letting latency pile up.
+    """
+
+    def __init__(self, limit, queue, timeout):
+        self.limit = limit
+        self.queue = queue
+        self.timeout = timeout
+        self.active = 0
+        self.waiting = 0
+        self._semaphore = asyncio.Semaphore(limit)
+
+    async def __aenter__(self):
+        if self._semaphore.locked() and self.waiting >= self.queue:
+            raise HTTPError(503, "server busy, retry shortly", [(b'retry-after', b'1')])
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self.timeout)
+        except asyncio.TimeoutError:
+            raise HTTPError(503, "timed out waiting for capacity", [(b'retry-after', b'1')]) from None
+        finally:
+            self.waiting -= 1
+        self.active += 1
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.active -= 1
+        self._semaphore.release()
+        return False
+
+
+# ==============================
+# Shared state (one copy per worker process)
+# ==============================
+result_cache = cache.ResultCache.from_config()
+limiters = {
+    # Text, URL reputation and metadata triage: milliseconds each
+    'light': Limiter(config.get_int('api_concurrency'), config.get_int('api_queue_size'),
+                     config.get_float('api_queue_timeout_seconds')),
+    # Full pixel forensics: CPU-bound, so by default one at a time per core
+    'image': Limiter(config.get_int('api_image_concurrency') or os.cpu_count() or 1, config.get_int('api_queue_size'),
+                     config.get_float('api_queue_timeout_seconds')),
+}
+executor = ThreadPoolExecutor(max_workers=sum(limiter.limit for limiter in limiters.values()),
+                              thread_name_prefix="api")
+max_body_bytes = config.get_int('api_max_body_mb') * 1024 * 1024
+near_duplicates = (phash.PerceptualIndex.from_config((forensics.ENGINE_VERSION, forensics.SKIN_MODEL))
+                   if config.get_int('near_duplicate_distance') > 0 else None)
+near_duplicate_texts = bulk_text.default_near_duplicates()
+
+_responses = Counter()  # (route, status) -> count
+_responses_lock = threading.Lock()
+
+
+async def run_limited(kind, key, compute, should_store=None):
+    """Cached result for key, or compute() on the worker pool under the `kind` limiter"""
+    missing = object()
+    value = result_cache.get(key, missing)
+    if value is not missing:
+        return value
+    async with limiters[kind]:
+        value = await asyncio.get_running_loop().run_in_executor(executor, compute)
+    if should_store is None or should_store(value):
+        result_cache.put(key, value)
+    return value
+
+
+# ==============================
+# Request helpers
+# ==============================
+class Request:
+    def __init__(self, scope, body):
+        self.method = scope['method']
+        self.path = scope['path']
+        self.query = {key: values[-1] for key, values in parse_qs(scope.get('query_string', b'').decode()).items()}
+        self.headers = {name.decode('latin-1').lower(): value.decode('latin-1') for name, value in scope['headers']}
+        self.body = body
+
+    def json(self):
+        try:
+            data = json.loads(self.body or b'null')
+        except ValueError:
+            raise HTTPError(400, "request body is not valid JSON") from None
+        if not isinstance(data, dict):
+            raise HTTPError(400, "request body must be a JSON object")
+        return data
+
+    def flag(self, name):
+        return self.query.get(name, '').strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+async def read_body(scope, receive):
+    declared = dict(scope['headers']).get(b'content-length')
+    if declared is not None and declared.isdigit() and int(declared) > max_body_bytes:
+        raise HTTPError(413, f"request body exceeds {max_body_bytes:,} bytes")
+    body = bytearray()
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            raise ConnectionResetError("client disconnected")
+        body += message.get('body', b'')
+        if len(body) > max_body_bytes:
+            raise HTTPError(413, f"request body exceeds {max_body_bytes:,} bytes")
+        if not message.get('more_body'):
+            return bytes(body)
+
+
+async def send_response(send, status, payload, headers=()):
+    if isinstance(payload, str):
+        body, content_type = payload.encode('utf-8'), b'text/plain; version=0.0.4; charset=utf-8'
+    else:
+        body, content_type = json.dumps(payload, ensure_ascii=False, default=str).encode('utf-8'), b'application/json'
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', content_type), (b'content-length', str(len(body)).encode())] + list(headers),
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+# ==============================
+# Endpoints
+# ==============================
+async def analyze_text(request):
+    data = request.json()
+    text = data.get('text')
+    if not isinstance(text, str) or not text.strip():
+        raise HTTPError(400, "'text' must be a non-empty string")
+    mode = str(data.get('mode') or DEFAULT_TEXT_MODE)
+    kb = text_analysis.knowledge_base()
+    # Same key as the Text Analyzer tab, so a shared disk cache serves both
+    key = cache.make_key('text', cache.normalize_text(text).encode(), mode, text_analysis.ENGINE_VERSION,
+                         kb.fingerprint, scoring.seed())
+    return await run_limited('light', key, lambda: text_analysis.analyze_text(text, kb, near_duplicate_texts))
+
+
+async def analyze_url(request):
+    data = request.json()
+    engine = url_reputation.default_engine()
+    if 'urls' in data:
+        urls = data['urls']
+        if not isinstance(urls, list) or not all(isinstance(url, str) for url in urls):
+            raise HTTPError(400, "'urls' must be a list of strings")
+        if len(urls) > MAX_BATCH_URLS:
+            raise HTTPError(413, f"at most {MAX_BATCH_URLS} URLs per request")
+        async with limiters['light']:
+            scored = await asyncio.get_running_loop().run_in_executor(executor, lambda: list(engine.score_urls(urls)))
+        return {'results': [dict(result or {'error': "no valid hostname"}, url=url) for url, result in scored]}
+
+    url = data.get('url')
+    if not isinstance(url, str) or not url.strip():
+        raise HTTPError(400, "'url' must be a non-empty string")
+    result = engine.score_url(url)  # one index lookup: cheaper than a trip to the pool
+    if result is None:
+        raise HTTPError(422, "no valid hostname in 'url'")
+    return dict(result, url=url)
+
+
+async def analyze_image(request):
+    content_type = request.headers.get('content-type', 'application/octet-stream')
+    if not content_type.startswith(IMAGE_CONTENT_TYPES):
+        raise HTTPError(415, "send the raw image bytes with an image/* content type")
+    if not request.body:
+        raise HTTPError(400, "empty request body")
+    filename = request.query.get('filename') or None
+    mode = request.query.get('mode', 'full')
+    if mode not in ('full', 'metadata'):
+        raise HTTPError(400, "'mode' must be 'full' or 'metadata'")
+
+    def compute():
+        try:
+            if mode == 'metadata':
+                return forensics.analyze_metadata(request.body, filename)
+            return forensics.analyze_image(request.body, filename, early_exit=early_exit,
+                                           near_duplicates=near_duplicates)
+        except forensics.ImageTooLarge as error:
+            raise HTTPError(413, str(error)) from None
+        except forensics.DECODE_ERRORS:
+            raise HTTPError(422, "could not decode the image") from None
+
+    if mode == 'metadata':
+        async with limiters['light']:
+            result = await asyncio.get_running_loop().run_in_executor(executor, compute)
+    else:
+        early_exit = request.flag('early_exit') if 'early_exit' in request.query else config.get_bool('early_exit')
+        # Same key as the Deepfake tab
+        key = cache.make_key('image', request.body, filename, forensics.DECODE_MAX_PIXELS,
+                             forensics.ANALYSIS_MAX_PIXELS, early_exit, forensics.SKIN_MODEL,
+                             forensics.ENGINE_VERSION)
+        result = await run_limited('image', key, compute, should_store=lambda analysis: analysis.complete)
+    return result.to_dict()
+
+
+async def healthz(request):
+    return {
+        'status': 'ok',
+        'engines': {
+            'text': text_analysis.ENGINE_VERSION,
+            'forensics': forensics.ENGINE_VERSION,
+            'claims': text_analysis.knowledge_base().fingerprint,
+        },
+        'limits': {kind: {'limit': limiter.limit, 'active': limiter.active, 'waiting': limiter.waiting}
+                   for kind, limiter in limiters.items()},
+        'cache': result_cache.stats(),
+    }
+
+
+async def metrics(request):
+    lines = [instrumentation.render_prometheus().rstrip('\n'),
+             "# HELP trustbuddy_api_responses_total HTTP responses by route and status",
+             "# TYPE trustbuddy_api_responses_total counter"]
+    with _responses_lock:
+        for (route, status), count in sorted(_responses.items()):
+            lines.append(f'trustbuddy_api_responses_total{{route="{route}",status="{status}"}} {count}')
+    lines += ["# HELP trustbuddy_api_inflight Analyses running or queued by limiter",
+              "# TYPE trustbuddy_api_inflight gauge"]
+    for kind, limiter in limiters.items():
+        lines.append(f'trustbuddy_api_inflight{{kind="{kind}",state="active"}} {limiter.active}')
+        lines.append(f'trustbuddy_api_inflight{{kind="{kind}",state="waiting"}} {limiter.waiting}')
+    return '\n'.join(lines) + '\n'
+
+
+ROUTES = {
+    '/v1/text': ('POST', analyze_text),
+    '/v1/url': ('POST', analyze_url),
+    '/v1/image': ('POST', analyze_image),
+    '/healthz': ('GET', healthz),
+    '/metrics': ('GET', metrics),
+}
+
+
+# ==============================
+# ASGI entry point
+# ==============================
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            # Load the claim index and reputation index before the first request needs them
+            text_analysis.STORE.start_watching()
+            text_analysis.knowledge_base()
+            url_reputation.default_engine()
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            executor.shutdown(wait=False, cancel_futures=True)
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def app(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        await lifespan(receive, send)
+        return
+    if scope['type'] != 'http':
+        return
+
+    route = ROUTES.get(scope['path'])
+    headers = []
+    try:
+        if route is None:
+            raise HTTPError(404, "no such endpoint")
+        method, handler = route
+        if scope['method'] != method:
+            raise HTTPError(405, f"use {method}", [(b'allow', method.encode())])
+        body = await read_body(scope, receive) if method == 'POST' else b''
+        status, payload = 200, await handler(Request(scope, body))
+    except HTTPError as error:
+        status, payload, headers = error.status, {'error': str(error)}, error.headers
+    except ConnectionResetError:
+        return
+    with _responses_lock:
+        _responses[(scope['path'] if route else 'unknown', status)] += 1
+    await send_response(send, status, payload, headers)
@@ -0,0 +1,221 @@
+"""
+TrustBuddy AI - Offline benchmark harness
+
+Times the deepfake forensics (per check, plus decode) and the text claim
+rules on synthetic inputs, records peak traced memory, and writes the
+results as JSON so runs can be compared. No Streamlit server needed.
+
+    python bench.py --quick -o bench.json
+    python bench.py --sizes 256 1024 4096 --modes RGB L --compare bench.json
+"""
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from io import BytesIO
+
+import numpy as np
+from PIL import Image
+
+import forensics
+import text_analysis
+
+DEFAULT_SIZES = [256, 512, 1024, 2048, 4096, 8000]
+DEFAULT_MODES = ['RGB', 'RGBA', 'L', 'P']
+DEFAULT_FORMATS = ['PNG', 'JPEG', 'WEBP']
+DEFAULT_TEXT_LENGTHS = [200, 2000, 20000]
+
+# JPEG has no alpha or palette; those modes are converted the way an upload would be
+FORMAT_MODES = {'JPEG': {'RGB', 'L'}}
+
+FILLER_WORDS = ['the', 'report', 'says', 'officials', 'new', 'study', 'today', 'people', 'local', 'video',
+                'shared', 'online', 'claims', 'experts', 'data', 'city', 'health', 'news', 'update', 'week']
+
+
+# ==============================
+# Synthetic inputs
+# ==============================
+def synthetic_image(size, mode, seed=0):
+    """Deterministic photo-like test image: smooth gradients plus sensor-style noise"""
+    rng = np.random.default_rng(seed)
+    yy, xx = np.mgrid[0:size, 0:size].astype(np.float32) / size
+    rgb = np.stack([120 + 80 * xx, 90 + 60 * yy, 60 + 50 * (xx * yy)], axis=2)
+    rgb += rng.normal(0, 12, rgb.shape).astype(np.float32)
+    image = Image.fromarray(np.clip(rgb, 0, 255).astype(np.uint8), 'RGB')
+    return image if mode == 'RGB' else image.convert(mode)
+
+
+def encode(image, fmt):
+    buffer = BytesIO()
+    if fmt in FORMAT_MODES and image.mode not in FORMAT_MODES[fmt]:
+        image = image.convert('RGB')
+    image.save(buffer, format=fmt)
+    return buffer.getvalue()
+
+
+def synthetic_text(length, rng):
+    """A post of about `length` characters, sometimes carrying a known claim or red-flag phrase"""
+    kb = text_analysis.knowledge_base()
+    words = []
+    while sum(len(word) + 1 for word in words) < length:
+        roll = rng.random()
+        if roll < 0.02 and kb.claims:
+            rule = rng.choice(kb.claims)
+            words.extend(rng.choice(group) for group in rule['require'])
+        elif roll < 0.04 and kb.suspicious_words:
+            words.append(rng.choice(kb.suspicious_words))
+        else:
+            words.append(rng.choice(FILLER_WORDS))
+    return ' '.join(words)
+
+
+# ==============================
+# Measurement
+# ==============================
+def measure(fn, repeat):
+    """Run fn `repeat` times; return (fastest result, fastest seconds, peak traced bytes)"""
+    best, best_seconds, peak = None, float('inf'), 0
+    for _ in range(repeat):
+        tracemalloc.start()
+        started = time.perf_counter()
+        result = fn()
+        seconds = time.perf_counter() - started
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        if seconds < best_seconds:
+            best, best_seconds = result, seconds
+    return best, best_seconds, peak
+
+
+def bench_image(size, mode, fmt, repeat, **analysis_options):
+    data = encode(synthetic_image(size, mode), fmt)
+
+    def run():
+        decode_started = time.perf_counter()
+        decoded = forensics.decode_image(data)
+        decode_seconds = time.perf_counter() - decode_started
+        return decode_seconds, forensics.analyze_image(decoded, 'bench.' + fmt.lower(), **analysis_options)
+
+    (decode_seconds, result), seconds, peak = measure(run, repeat)
+    stages = {'decode': decode_seconds}
+    stages.update(result.timings)
+    return {
+        'suite': 'image',
+        'case': f"{size}x{size}/{mode}/{fmt}",
+        'bytes': len(data),
+        'stages': stages,
+        'total_seconds': seconds,
+        'peak_bytes': peak,
+        'ai_indicators': result.ai_indicators,
+    }
+
+
+def bench_text(length, records, repeat, seed=0):
+    rng = random.Random(seed)
+    corpus = [synthetic_text(length, rng) for _ in range(records)]
+    kb = text_analysis.knowledge_base()
+
+    def run():
+        for post in corpus:
+            text_analysis.analyze_text(post, kb)
+
+    _, seconds, peak = measure(run, repeat)
+    return {
+        'suite': 'text',
+        'case': f"{records}x{length}chars",
+        'stages': {'analyze_text': seconds},
+        'total_seconds': seconds,
+        'records_per_second': records / seconds if seconds else None,
+        'peak_bytes': peak,
+    }
+
+
+# ==============================
+# Comparison
+# ==============================
+def compare(current, baseline, threshold):
+    """Stage timings slower than baseline by more than `threshold` (fraction)"""
+    previous = {(r['suite'], r['case']): r for r in baseline['results']}
+    regressions = []
+    for result in current['results']:
+        before = previous.get((result['suite'], result['case']))
+        if before is None:
+            continue
+        for stage, seconds in result['stages'].items():
+            old = before['stages'].get(stage)
+            # Ignore sub-millisecond stages, their noise dwarfs any real change
+            if old and max(old, seconds) > 1e-3 and seconds > old * (1 + threshold):
+                regressions.append({'case': result['case'], 'stage': stage, 'before': old, 'after': seconds,
+                                    'change': seconds / old - 1})
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the TrustBuddy analysis hot paths")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--modes', nargs='+', default=DEFAULT_MODES)
+    parser.add_argument('--formats', nargs='+', default=DEFAULT_FORMATS)
+    parser.add_argument('--text-lengths', type=int, nargs='+', default=DEFAULT_TEXT_LENGTHS)
+    parser.add_argument('--text-records', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per case; the fastest is kept")
+    parser.add_argument('--max-pixels', type=int, default=forensics.ANALYSIS_MAX_PIXELS)
+    parser.add_argument('--quick', action='store_true', help="Small smoke run: 256/1024, RGB+L, PNG+JPEG")
+    parser.add_argument('-o', '--output', help="Write JSON results here (default: stdout)")
+    parser.add_argument('--compare', help="Previous JSON results to check for regressions")
+    parser.add_argument('--threshold', type=float, default=0.2, help="Allowed slowdown before flagging (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    if args.quick:
+        args.sizes, args.modes, args.formats = [256, 1024], ['RGB', 'L'], ['PNG', 'JPEG']
+        args.text_lengths, args.text_records, args.repeat = [200, 2000], 500, 1
+
+    results = []
+    for size in args.sizes:
+        for mode in args.modes:
+            for fmt in args.formats:
+                result = bench_image(size, mode, fmt, args.repeat, max_pixels=args.max_pixels)
+                print(f"image {result['case']:<24} {result['total_seconds']:8.3f}s "
+                      f"peak {result['peak_bytes'] / 2**20:8.1f} MB", file=sys.stderr)
+                results.append(result)
+    for length in args.text_lengths:
+        result = bench_text(length, args.text_records, args.repeat)
+        print(f"text  {result['case']:<24} {result['total_seconds']:8.3f}s "
+              f"{result['records_per_second']:,.0f} records/sec", file=sys.stderr)
+        results.append(result)
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'forensics_engine': forensics.ENGINE_VERSION,
+            'text_engine': text_analysis.ENGINE_VERSION,
+            'claims': text_analysis.knowledge_base().fingerprint,
+        },
+        'results': results,
+    }
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as handle:
+            report['regressions'] = compare(report, json.load(handle), args.threshold)
+        for regression in report['regressions']:
+            print(f"REGRESSION {regression['case']} {regression['stage']}: "
+                  f"{regression['before']:.4f}s -> {regression['after']:.4f}s (+{regression['change']:.0%})",
+                  file=sys.stderr)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as handle:
+            handle.write(output + '\n')
+    else:
+        print(output)
+    return 1 if report.get('regressions') else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,260 @@
+"""
+TrustBuddy AI - Batch deepfake scanning
+
+Sweeps folders, ZIP archives or a batch of uploads through the forensic
+checks on a process pool, one image per task. Each worker reads and
+decodes its own image, so decoding of one image overlaps the analysis of
+the others. Rows stream to CSV / JSONL as they complete. A checkpoint file
+records finished items, so an interrupted sweep resumes where it stopped.
+
+    python bulk_images.py photos/ uploads.zip -o verdicts.csv --resume
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import bulk_text
+import config
+import forensics
+import instrumentation
+
+OUTPUT_FIELDS = ['id', 'filename', 'width', 'height', 'ai_indicators', 'authenticity_score', 'suspicion_score',
+                 'verdict', 'flags', 'skipped', 'seconds', 'error']
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp')
+# ZIP members bigger than this are reported, not extracted (zip-bomb guard)
+MAX_MEMBER_BYTES = 256 * 1024 * 1024
+
+# Native thread pools in every worker would oversubscribe the cores the pool already fills
+THREAD_ENV_VARS = ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS')
+
+
+# ==============================
+# Inputs
+# ==============================
+def is_image_name(name):
+    return name.lower().endswith(IMAGE_EXTENSIONS) and not os.path.basename(name).startswith('.')
+
+
+def zip_items(archive, label, member_source):
+    """Items for the image members of an open ZipFile; member_source(info) builds each source"""
+    for info in archive.infolist():
+        if info.is_dir() or not is_image_name(info.filename) or info.filename.startswith('__MACOSX/'):
+            continue
+        yield f"{label}:{info.filename}", os.path.basename(info.filename), member_source(info)
+
+
+def iter_items(paths):
+    """Yield (item_id, filename, source) for every image under the given files, folders and ZIPs.
+
+    Sources are small picklable descriptions ('path', ...) / ('zip', ...)
+    so the bytes are read inside the worker, not shipped to it.
+    """
+    for path in paths:
+        if os.path.isdir(path):
+            root_label = os.path.basename(os.path.normpath(path))
+            for folder, dirs, files in os.walk(path):
+                dirs.sort()
+                for name in sorted(files):
+                    if is_image_name(name):
+                        full = os.path.join(folder, name)
+                        yield os.path.join(root_label, os.path.relpath(full, path)), name, ('path', full)
+        elif zipfile.is_zipfile(path):
+            with zipfile.ZipFile(path) as archive:
+                yield from zip_items(archive, os.path.basename(path),
+                                     lambda info: ('zip', os.path.abspath(path), info.filename, info.file_size))
+        elif is_image_name(path):
+            yield path, os.path.basename(path), ('path', path)
+
+
+def iter_uploads(uploaded_files):
+    """Items for Streamlit uploads; ZIP uploads are expanded member by member"""
+    for uploaded in uploaded_files:
+        if uploaded.name.lower().endswith('.zip'):
+            with zipfile.ZipFile(uploaded) as archive:
+                yield from zip_items(archive, uploaded.name, lambda info: (
+                    ('bytes', archive.read(info)) if info.file_size <= MAX_MEMBER_BYTES
+                    else ('oversized', info.file_size)))
+        else:
+            yield uploaded.name, uploaded.name, ('bytes', uploaded.getvalue())
+
+
+_archives = {}  # per worker process: archive path -> open ZipFile
+
+
+def read_source(source):
+    """Bytes of an item's image, read inside the worker"""
+    kind = source[0]
+    if kind == 'bytes':
+        return source[1]
+    if kind == 'path':
+        with open(source[1], 'rb') as handle:
+            return handle.read()
+    if kind == 'zip':
+        _, archive_path, member, size = source
+        if size > MAX_MEMBER_BYTES:
+            raise forensics.ImageTooLarge(f"archive member is {size:,} bytes uncompressed")
+        if archive_path not in _archives:
+            _archives[archive_path] = zipfile.ZipFile(archive_path)
+        return _archives[archive_path].read(member)
+    if kind == 'oversized':
+        raise forensics.ImageTooLarge(f"archive member is {source[1]:,} bytes uncompressed")
+    raise ValueError(f"unknown image source {kind!r}")
+
+
+# ==============================
+# Worker
+# ==============================
+def _init_worker():
+    # Per-process stage totals would overwrite each other in the shared metrics file
+    instrumentation.configure(metrics_file='')
+
+
+def scan_item(item, early_exit=False):
+    """Analyse one (item_id, filename, source); runs in a worker process and never raises for bad images"""
+    item_id, filename, source = item
+    started = time.perf_counter()
+    row = dict.fromkeys(OUTPUT_FIELDS)
+    row.update(id=item_id, filename=filename)
+    try:
+        result = forensics.analyze_image(read_source(source), filename, early_exit=early_exit)
+    except (*forensics.DECODE_ERRORS, zipfile.BadZipFile) as error:
+        # Undecodable, truncated or oversized images; ImageTooLarge is a ValueError
+        row['error'] = f"{type(error).__name__}: {error}"
+    else:
+        row.update(width=result.width, height=result.height, ai_indicators=result.ai_indicators,
+                   authenticity_score=result.authenticity_score, suspicion_score=result.suspicion_score,
+                   verdict=result.verdict, flags=[detail for detail in result.detection_details if '🚩' in detail],
+                   skipped=result.skipped)
+    row['seconds'] = round(time.perf_counter() - started, 4)
+    return row
+
+
+# ==============================
+# Checkpoint
+# ==============================
+class Checkpoint:
+    """Append-only list of finished item ids, flushed after every row.
+
+    Rows are written before their id is recorded, so a crash between the
+    two repeats at most the in-flight items on resume, never skips one.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.done = set()
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as handle:
+                self.done = {line.rstrip('\n') for line in handle if line.strip()}
+        self._handle = open(path, 'a', encoding='utf-8')
+
+    def mark(self, item_id):
+        self._handle.write(f"{item_id}\n")
+        self._handle.flush()
+
+    def close(self):
+        self._handle.close()
+
+
+# ==============================
+# Pipeline
+# ==============================
+def default_workers():
+    return config.get_int('batch_workers') or os.cpu_count() or 1
+
+
+def make_pool(workers=None):
+    """Process pool for scan_item, started with 'spawn' so it is safe inside a threaded server"""
+    for name in THREAD_ENV_VARS:
+        os.environ.setdefault(name, '1')
+    return ProcessPoolExecutor(max_workers=workers or default_workers(), initializer=_init_worker,
+                               mp_context=multiprocessing.get_context('spawn'))
+
+
+def run(items, writer, on_progress=None, every=10, workers=None, checkpoint=None, pool=None, early_exit=None):
+    """Scan items on a process pool, writing rows in completion order.
+
+    Items are pulled lazily with a few tasks queued per worker, so the
+    queue, not the input size, bounds memory. Items already in
+    `checkpoint` are skipped. early_exit defaults to the early_exit setting.
+    """
+    if early_exit is None:
+        early_exit = config.get_bool('early_exit')
+    throughput = bulk_text.Throughput()
+    workers = workers or default_workers()
+    owned = pool is None
+    pool = pool or make_pool(workers)
+    window = workers * 4
+    pending = set()
+    remaining = iter(items)
+    exhausted = False
+    try:
+        while True:
+            while not exhausted and len(pending) < window:
+                item = next(remaining, None)
+                if item is None:
+                    exhausted = True
+                elif checkpoint is None or item[0] not in checkpoint.done:
+                    pending.add(pool.submit(scan_item, item, early_exit))
+            if not pending:
+                break
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                row = future.result()
+                writer.write(row)
+                writer.stream.flush()
+                if checkpoint is not None:
+                    checkpoint.mark(row['id'])
+                throughput.tick()
+                if on_progress is not None and throughput.count % every == 0:
+                    on_progress(throughput)
+    finally:
+        if owned:
+            pool.shutdown(cancel_futures=True)
+    if on_progress is not None:
+        on_progress(throughput)
+    return throughput
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch-scan folders and ZIP archives of images for AI generation")
+    parser.add_argument('inputs', nargs='+', help="Image files, folders (searched recursively) or ZIP archives")
+    parser.add_argument('-o', '--output', default='-', help="CSV/JSONL output file, or - for stdout (JSONL)")
+    parser.add_argument('--workers', type=int, help="Worker processes (default: one per CPU core)")
+    parser.add_argument('--checkpoint', help="Finished-item list (default: <output>.done)")
+    parser.add_argument('--resume', action='store_true', help="Skip items in the checkpoint and append to the output")
+    parser.add_argument('--early-exit', action='store_true', default=None,
+                        help="Stop each image's checks once its verdict is decided (scores become lower bounds)")
+    args = parser.parse_args(argv)
+
+    out_format = 'jsonl' if args.output == '-' else bulk_text.detect_format(args.output)
+    checkpoint_path = args.checkpoint or (None if args.output == '-' else args.output + '.done')
+    if checkpoint_path and not args.resume and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    checkpoint = Checkpoint(checkpoint_path) if checkpoint_path else None
+
+    appending = args.resume and args.output != '-' and os.path.exists(args.output)
+    target = sys.stdout if args.output == '-' else open(args.output, 'a' if appending else 'w', newline='',
+                                                          encoding='utf-8')
+
+    def report(throughput):
+        print(f"\r{throughput.count} images • {throughput.rate:,.1f} images/sec", end='', file=sys.stderr)
+
+    try:
+        writer = bulk_text.RowWriter(target, out_format, OUTPUT_FIELDS, header=not appending)
+        run(iter_items(args.inputs), writer, on_progress=report, workers=args.workers, checkpoint=checkpoint,
+            early_exit=args.early_exit)
+        print(file=sys.stderr)
+    finally:
+        if checkpoint is not None:
+            checkpoint.close()
+        if target is not sys.stdout:
+            target.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,223 @@
+"""
+TrustBuddy AI - Bulk text claim analysis
+
+Streams CSV / JSONL records through the Text Analyzer rules one at a time,
+so tens of thousands of posts can be screened without holding the inputs
+or the results in memory.
+
+    python bulk_text.py posts.csv -o verdicts.jsonl --field text
+"""
+import argparse
+import csv
+import io
+import itertools
+import json
+import sys
+import time
+
+import config
+import minhash
+import text_analysis
+
+OUTPUT_FIELDS = ['id', 'verdict', 'trust_score', 'claim', 'red_flags', 'near_duplicate', 'error']
+
+
+class InvalidRecord:
+    """Stands in for the text of an input record that could not be read"""
+
+    def __init__(self, error):
+        self.error = error
+
+
+def detect_format(filename):
+    """'csv' or 'jsonl' from a file name, defaulting to CSV"""
+    return 'jsonl' if filename.lower().endswith(('.jsonl', '.ndjson')) else 'csv'
+
+
+def open_upload(uploaded_file):
+    """Text stream over a Streamlit UploadedFile, decoded lazily.
+
+    Bytes that are not UTF-8 come through as surrogate escapes, so
+    read_records can turn just the records holding them into errors.
+    """
+    return io.TextIOWrapper(uploaded_file, encoding='utf-8', errors='surrogateescape', newline='')
+
+
+def is_utf8(value):
+    """False for text holding surrogate escapes of undecodable bytes"""
+    try:
+        value.encode('utf-8')
+    except UnicodeEncodeError:
+        return False
+    return True
+
+
+def read_records(stream, fmt, text_field='text', id_field='id'):
+    """Yield (record_id, text) from a text stream of CSV rows or JSON lines.
+
+    A malformed row or line, or one that is not UTF-8, yields (record
+    number, InvalidRecord) instead of stopping the run; records without
+    text are skipped.
+    """
+    rows = csv.DictReader(stream) if fmt == 'csv' else (line for line in stream if line.strip())
+    for number in itertools.count(1):
+        try:
+            row = next(rows)
+        except StopIteration:
+            return
+        except csv.Error as error:
+            yield number, InvalidRecord(f"unreadable CSV row: {error}")
+            continue
+        except UnicodeDecodeError:
+            # A strictly decoding stream: the rest of it can't be read reliably
+            yield number, InvalidRecord("input is not UTF-8 text")
+            return
+        if fmt != 'csv':
+            if not is_utf8(row):
+                yield number, InvalidRecord("line is not UTF-8 text")
+                continue
+            try:
+                row = json.loads(row)
+            except ValueError as error:
+                yield number, InvalidRecord(f"invalid JSON: {error}")
+                continue
+            if not isinstance(row, dict):
+                yield number, InvalidRecord(f"expected a JSON object, got {type(row).__name__}")
+                continue
+
+        text = row.get(text_field)
+        if not text:
+            continue
+        record_id = row.get(id_field)
+        if record_id is None:
+            record_id = number
+        if fmt == 'csv' and not all(is_utf8(value) for value in (str(text), str(record_id))):
+            yield number, InvalidRecord("row is not UTF-8 text")
+            continue
+        yield record_id, str(text)
+
+
+def analyze_records(records, near_duplicates=None):
+    """Yield one output row per (record_id, text) as soon as it is analysed.
+
+    With a minhash.NearDuplicateTexts, edited reposts of an earlier flagged
+    record inherit its verdict when it is more severe; near_duplicate holds
+    their similarity.
+    """
+    for record_id, text in records:
+        if isinstance(text, InvalidRecord):
+            yield dict(dict.fromkeys(OUTPUT_FIELDS), id=record_id, error=text.error)
+            continue
+        result = text_analysis.analyze_text(text, near_duplicates=near_duplicates)
+        details = result['analysis_details']
+        yield {
+            'id': record_id,
+            'verdict': details['verdict'],
+            'trust_score': result['trust_score'],
+            'claim': details['claim'],
+            'red_flags': details['red_flags'],
+            'near_duplicate': result['near_duplicate'],
+            'error': None,
+        }
+
+
+class Throughput:
+    """Running records/sec counter, with the number of records that failed"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.count = 0
+        self.errors = 0
+
+    def tick(self, error=False):
+        self.count += 1
+        self.errors += bool(error)
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    @property
+    def rate(self):
+        elapsed = self.elapsed
+        return self.count / elapsed if elapsed > 0 else 0.0
+
+
+class RowWriter:
+    """Write output rows to a text stream as CSV or JSONL, one at a time"""
+
+    def __init__(self, stream, fmt, fields=OUTPUT_FIELDS, header=True):
+        self.stream = stream
+        self.fmt = fmt
+        if fmt == 'csv':
+            self._csv = csv.DictWriter(stream, fieldnames=fields)
+            if header:
+                self._csv.writeheader()
+
+    def write(self, row):
+        if self.fmt == 'csv':
+            # List values (e.g. red_flags) become one '; '-separated cell
+            self._csv.writerow({key: '; '.join(value) if isinstance(value, list) else value
+                                for key, value in row.items()})
+        else:
+            self.stream.write(json.dumps(row, ensure_ascii=False) + '\n')
+
+
+def default_near_duplicates():
+    """A fresh near-duplicate index from the settings, or None when it is turned off"""
+    if config.get_float('near_duplicate_text_threshold') <= 0:
+        return None
+    return minhash.NearDuplicateTexts.from_config()
+
+
+def run(records, writer, on_progress=None, every=500, near_duplicates=None):
+    """Drive the pipeline; on_progress(throughput) is called every `every` records"""
+    throughput = Throughput()
+    for row in analyze_records(records, near_duplicates):
+        writer.write(row)
+        throughput.tick(error=row['error'] is not None)
+        if on_progress is not None and throughput.count % every == 0:
+            on_progress(throughput)
+    if on_progress is not None:
+        on_progress(throughput)
+    return throughput
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk-screen text claims from a CSV or JSONL file")
+    parser.add_argument('input', help="CSV/JSONL file, or - for stdin")
+    parser.add_argument('-o', '--output', default='-', help="CSV/JSONL output file, or - for stdout (JSONL)")
+    parser.add_argument('--field', default='text', help="Column / key holding the text (default: text)")
+    parser.add_argument('--id-field', default='id', help="Column / key holding the record id (default: id)")
+    parser.add_argument('--format', choices=['csv', 'jsonl'], help="Input format (default: from the file name)")
+    parser.add_argument('--no-near-duplicates', action='store_true',
+                        help="Analyse every record on its own, even edited copies of an earlier one")
+    args = parser.parse_args(argv)
+
+    in_format = args.format or ('jsonl' if args.input == '-' else detect_format(args.input))
+    out_format = 'jsonl' if args.output == '-' else detect_format(args.output)
+
+    if args.input == '-':
+        sys.stdin.reconfigure(errors='surrogateescape')
+    source = sys.stdin if args.input == '-' else open(args.input, newline='', encoding='utf-8',
+                                                      errors='surrogateescape')
+    target = sys.stdout if args.output == '-' else open(args.output, 'w', newline='', encoding='utf-8')
+
+    def report(throughput):
+        print(f"\r{throughput.count} records • {throughput.rate:,.0f} records/sec • {throughput.errors} unreadable",
+              end='', file=sys.stderr)
+
+    try:
+        records = read_records(source, in_format, args.field, args.id_field)
+        run(records, RowWriter(target, out_format), on_progress=report,
+            near_duplicates=None if args.no_near_duplicates else default_near_duplicates())
+        print(file=sys.stderr)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if target is not sys.stdout:
+            target.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,338 @@
+"""
+TrustBuddy AI - Bulk URL scanning
+
+Fetches many URLs concurrently, follows redirects to the final domain and
+scores that domain with the reputation index. An asyncio scheduler caps
+the requests in flight overall and per host, and every redirect hop takes
+a slot of the host it goes to. The blocking HTTP calls run on a thread
+pool that shares one pooled requests.Session, so keep-alive connections
+are reused. Results are yielded as they complete, not in input order.
+
+    python bulk_urls.py urls.txt -o scan.jsonl --concurrency 64 --per-host 4
+"""
+import argparse
+import asyncio
+import html
+import re
+import sys
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import bulk_text
+import config
+import instrumentation
+import url_reputation
+
+OUTPUT_FIELDS = ['url', 'final_url', 'status', 'redirects', 'domain', 'score', 'risk_level', 'source',
+                 'content_type', 'title', 'seconds', 'error']
+
+# Only the start of an HTML page is read, enough for its <title>
+MAX_BODY_BYTES = 64 * 1024
+TITLE_PATTERN = re.compile(rb'<title[^>]*>(.*?)</title>', re.IGNORECASE | re.DOTALL)
+USER_AGENT = 'TrustBuddyAI-URLScanner/1.0'
+# URLs read ahead of the requests in flight, per unit of concurrency, so other hosts'
+# URLs are found behind a long run of one busy host
+READ_AHEAD = 256
+
+
+def detect_format(filename):
+    """'txt' (one URL per line), 'csv' or 'jsonl' from a file name"""
+    return 'txt' if filename.lower().endswith(('.txt', '.lst')) else bulk_text.detect_format(filename)
+
+
+def read_urls(stream, fmt, url_field='url'):
+    """Yield URLs from a text stream: plain lines, CSV rows or JSON lines"""
+    if fmt == 'txt':
+        for line in stream:
+            line = line.strip()
+            if line and not line.startswith('#'):
+                yield line if bulk_text.is_utf8(line) else bulk_text.InvalidRecord("line is not UTF-8 text")
+        return
+    for _, url in bulk_text.read_records(stream, fmt, text_field=url_field):
+        # Malformed records pass through as InvalidRecord and come out as error rows
+        yield url if isinstance(url, bulk_text.InvalidRecord) else url.strip()
+
+
+def extract_title(body, encoding=None):
+    """Text of the first <title> element in an HTML byte string, or None"""
+    match = TITLE_PATTERN.search(body)
+    if not match:
+        return None
+    title = match.group(1).decode(encoding or 'utf-8', errors='replace')
+    return ' '.join(html.unescape(title).split())[:200] or None
+
+
+class HostSlots:
+    """Requests in flight per host, shared by the scheduler and the worker threads"""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self._busy = Counter()
+        self._freed = threading.Condition()
+
+    def available(self, host):
+        with self._freed:
+            return self._busy[host] < self.limit
+
+    def try_acquire(self, host):
+        with self._freed:
+            if self._busy[host] >= self.limit:
+                return False
+            self._busy[host] += 1
+            return True
+
+    def acquire(self, host):
+        """Take a slot, waiting for one to be released if the host is at its limit"""
+        with self._freed:
+            self._freed.wait_for(lambda: self._busy[host] < self.limit)
+            self._busy[host] += 1
+
+    def release(self, host):
+        with self._freed:
+            self._busy[host] -= 1
+            if not self._busy[host]:
+                del self._busy[host]
+            self._freed.notify_all()
+
+
+class URLScanner:
+    """Concurrent fetch-and-score over a shared connection pool.
+
+    `concurrency` bounds the requests in flight and the worker threads.
+    `per_host` bounds the requests in flight to any one host, redirect
+    hops included, and is also the size of each host's connection pool.
+    `timeout` applies to connecting, to each read, and to reading the page
+    start as a whole.
+    """
+
+    def __init__(self, concurrency=None, per_host=None, timeout=None, max_redirects=None, reputation=None):
+        self.concurrency = concurrency or config.get_int('url_concurrency')
+        self.per_host = per_host or config.get_int('url_per_host')
+        self.timeout = timeout or config.get_float('url_timeout_seconds')
+        self.max_redirects = max_redirects if max_redirects is not None else config.get_int('url_max_redirects')
+        self.reputation = reputation or url_reputation.default_engine()
+        self.slots = HostSlots(self.per_host)
+
+        self.session = requests.Session()
+        self.session.headers['User-Agent'] = USER_AGENT
+        adapter = HTTPAdapter(pool_connections=self.concurrency, pool_maxsize=self.per_host)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="url-scan")
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+
+    # ------------------------------
+    # One URL (runs on a worker thread)
+    # ------------------------------
+    def fetch(self, url, host):
+        """Fetch one URL and score its final domain; never raises.
+
+        `host` is the slot scan() took for the URL. Returns (row, hosts
+        whose slots this call held); every one is released on return.
+        """
+        started = time.perf_counter()
+        row = dict.fromkeys(OUTPUT_FIELDS)
+        hosts = [host]  # the slot held is always the last one
+        try:
+            self._fetch(url, row, hosts, started)
+        finally:
+            self.slots.release(hosts[-1])
+        return row, hosts
+
+    def _fetch(self, url, row, hosts, started):
+        if isinstance(url, bulk_text.InvalidRecord):
+            row.update(error=url.error, seconds=0.0)
+            return
+        row.update(url=url, redirects=0)
+        target = url if '://' in url else 'https://' + url
+
+        if not url_reputation.normalize_host(target):
+            row.update(error='InvalidURL', seconds=0.0)
+            return
+
+        with instrumentation.stage("url.fetch"):
+            try:
+                with self._follow(target, row, hosts) as response:
+                    content_type = response.headers.get('Content-Type', '')
+                    row.update(final_url=response.url, status=response.status_code, content_type=content_type)
+                    if 'html' in content_type:
+                        row['title'] = extract_title(self._read_start(response, started), response.encoding)
+            except requests.RequestException as error:
+                row['error'] = type(error).__name__
+
+        reputation = self.reputation.score_url(row['final_url'] or target)
+        if reputation is not None:
+            row.update(domain=reputation['domain'], score=reputation['score'],
+                       risk_level=reputation['risk_level'], source=reputation['source'])
+        row['seconds'] = round(time.perf_counter() - started, 4)
+
+    def _follow(self, target, row, hosts):
+        """Open response at the end of target's redirects, counting them in row['redirects'].
+
+        Redirects are followed one hop at a time. A hop to another host gives
+        up the slot held before waiting for the new host's, so a worker never
+        holds one slot while it waits for another.
+        """
+        response = self.session.get(target, timeout=self.timeout, stream=True, allow_redirects=False)
+        while response.is_redirect:
+            redirect = response.next
+            response.close()
+            if row['redirects'] >= self.max_redirects:
+                raise requests.TooManyRedirects(f"Exceeded {self.max_redirects} redirects")
+            row['redirects'] += 1
+            host = url_reputation.normalize_host(redirect.url) or redirect.url
+            if host != hosts[-1]:
+                self.slots.release(hosts[-1])
+                self.slots.acquire(host)
+                hosts.append(host)
+            response = self.session.send(redirect, timeout=self.timeout, stream=True, allow_redirects=False)
+        return response
+
+    def _read_start(self, response, started):
+        """Up to MAX_BODY_BYTES of the body, stopping early once the timeout has elapsed"""
+        body = bytearray()
+        for chunk in response.iter_content(chunk_size=16 * 1024):
+            body += chunk
+            if len(body) >= MAX_BODY_BYTES or time.perf_counter() - started > self.timeout:
+                break
+        return bytes(body[:MAX_BODY_BYTES])
+
+    # ------------------------------
+    # Scheduling
+    # ------------------------------
+    async def scan(self, urls):
+        """Async generator of result rows, in completion order.
+
+        URLs wait in one queue per host, and a request starts only when
+        its host is below `per_host` and fewer than `concurrency` are in
+        flight, so URLs for a crowded host never hold slots other hosts
+        could use. Hosts with work take turns. Redirect hops take their
+        hosts' slots from the same HostSlots; a host whose slot a hop
+        released gets its turn back when that fetch completes. The input is read lazily,
+        at most READ_AHEAD * concurrency URLs ahead of the requests in
+        flight, so inputs of any length stream through in bounded memory.
+        """
+        loop = asyncio.get_running_loop()
+        read_ahead = READ_AHEAD * self.concurrency
+        queues = {}  # host -> deque of URLs waiting; dropped when empty
+        runnable, in_turn = deque(), set()  # hosts with waiting URLs and a free slot, in turn order
+        running = set()
+        waiting = 0
+        remaining = iter(urls)
+        exhausted = False
+
+        def enqueue(host):
+            if host in queues and host not in in_turn and self.slots.available(host):
+                runnable.append(host)
+                in_turn.add(host)
+
+        while True:
+            while not exhausted and waiting < read_ahead:
+                url = next(remaining, None)
+                if url is None:
+                    exhausted = True
+                    break
+                # Invalid URLs and records fail inside fetch() at once; give each its own queue
+                host = (isinstance(url, str) and url_reputation.normalize_host(url if '://' in url else 'https://' + url)
+                        or url)
+                queues.setdefault(host, deque()).append(url)
+                waiting += 1
+                enqueue(host)
+
+            while runnable and len(running) < self.concurrency:
+                host = runnable.popleft()
+                in_turn.discard(host)
+                if not self.slots.try_acquire(host):  # a redirect hop took the slot
+                    continue
+                queue = queues[host]
+                url = queue.popleft()
+                waiting -= 1
+                if not queue:
+                    del queues[host]
+                running.add(loop.run_in_executor(self._executor, self.fetch, url, host))
+                enqueue(host)
+
+            if not running:  # nothing waits either: a waiting URL's host would have a free slot
+                break
+            done, running = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                row, hosts = future.result()
+                for host in hosts:
+                    enqueue(host)
+                yield row
+
+
+def run(urls, writer, on_progress=None, every=50, scanner=None):
+    """Scan synchronously, writing rows as they complete; on_progress(throughput) every `every` rows"""
+    throughput = bulk_text.Throughput()
+
+    async def drain(active_scanner):
+        async for row in active_scanner.scan(urls):
+            writer.write(row)
+            throughput.tick()
+            if on_progress is not None and throughput.count % every == 0:
+                on_progress(throughput)
+
+    if scanner is not None:
+        asyncio.run(drain(scanner))
+    else:
+        with URLScanner() as owned:
+            asyncio.run(drain(owned))
+    instrumentation.export_metrics()
+    if on_progress is not None:
+        on_progress(throughput)
+    return throughput
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk-scan URLs: fetch, follow redirects and score the final domain")
+    parser.add_argument('input', help="Text file with one URL per line, CSV/JSONL file, or - for stdin")
+    parser.add_argument('-o', '--output', default='-', help="CSV/JSONL output file, or - for stdout (JSONL)")
+    parser.add_argument('--field', default='url', help="CSV column / JSON key holding the URL (default: url)")
+    parser.add_argument('--format', choices=['txt', 'csv', 'jsonl'], help="Input format (default: from the file name)")
+    parser.add_argument('--concurrency', type=int, help="Requests in flight overall")
+    parser.add_argument('--per-host', type=int, help="Requests in flight to any one host")
+    parser.add_argument('--timeout', type=float, help="Seconds allowed to connect and per read")
+    args = parser.parse_args(argv)
+
+    in_format = args.format or ('txt' if args.input == '-' else detect_format(args.input))
+    out_format = 'jsonl' if args.output == '-' else bulk_text.detect_format(args.output)
+
+    if args.input == '-':
+        sys.stdin.reconfigure(errors='surrogateescape')
+    source = sys.stdin if args.input == '-' else open(args.input, newline='', encoding='utf-8',
+                                                      errors='surrogateescape')
+    target = sys.stdout if args.output == '-' else open(args.output, 'w', newline='', encoding='utf-8')
+
+    def report(throughput):
+        print(f"\r{throughput.count} URLs • {throughput.rate * 60:,.0f} URLs/min", end='', file=sys.stderr)
+
+    try:
+        with URLScanner(args.concurrency, args.per_host, args.timeout) as scanner:
+            writer = bulk_text.RowWriter(target, out_format, OUTPUT_FIELDS)
+            run(read_urls(source, in_format, args.field), writer, on_progress=report, scanner=scanner)
+        print(file=sys.stderr)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if target is not sys.stdout:
+            target.close()
+
+
+if __name__ == '__main__':
+    main()
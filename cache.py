@@ -0,0 +1,210 @@
+"""
+TrustBuddy AI - Content-addressed result cache
+
+Analyses are keyed by a SHA-256 of their input (image bytes or normalized
+text), the analysis options and the engine version, so a re-submitted
+image or claim is answered from memory instead of being recomputed.
+"""
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+import config
+
+# Scan the disk tier for expired / excess entries every this many writes
+DISK_PRUNE_INTERVAL = 256
+
+
+def normalize_text(text):
+    """Canonical form of a text input; the analyzer only ever sees text.lower()"""
+    return text.strip().lower()
+
+
+def make_key(kind, payload, *parts):
+    """Content hash of an input plus everything that can change its result"""
+    digest = hashlib.sha256()
+    digest.update(kind.encode())
+    for part in parts:
+        digest.update(b'\0' + repr(part).encode())
+    digest.update(b'\0')
+    digest.update(payload)
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """Thread-safe LRU cache with a byte-size cap, TTL and optional disk tier"""
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, ttl=6 * 60 * 60, disk_dir=None):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.disk_dir = disk_dir or None
+        self._entries = OrderedDict()  # key -> (value, size, expires_at)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._disk_writes = 0
+        self.counters = {'hits': 0, 'disk_hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0}
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+
+    @classmethod
+    def from_config(cls):
+        return cls(
+            max_bytes=config.get_int('cache_max_mb') * 1024 * 1024,
+            ttl=config.get_float('cache_ttl_seconds'),
+            disk_dir=config.get_setting('cache_dir'),
+        )
+
+    # ------------------------------
+    # Public API
+    # ------------------------------
+    def get(self, key, default=None):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[2] > now:
+                    self._entries.move_to_end(key)
+                    self.counters['hits'] += 1
+                    return entry[0]
+                self._drop(key)
+                self.counters['expirations'] += 1
+
+        value, size, expires_at = self._read_disk(key, now)
+        with self._lock:
+            if size is None:
+                self.counters['misses'] += 1
+                return default
+            self.counters['disk_hits'] += 1
+            self._store(key, value, size, expires_at)
+        return value
+
+    def put(self, key, value):
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            self._store(key, value, len(blob), expires_at)
+        self._write_disk(key, blob, expires_at)
+
+    def get_or_compute(self, key, compute, should_store=None):
+        """Cached value for key, running compute() and storing its result on a miss.
+
+        should_store(value) can veto storing a result, e.g. a partial one.
+        """
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = compute()
+            if should_store is None or should_store(value):
+                self.put(key, value)
+        return value
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counters)
+            stats['entries'] = len(self._entries)
+            stats['bytes'] = self._bytes
+        lookups = stats['hits'] + stats['disk_hits'] + stats['misses']
+        stats['hit_rate'] = (stats['hits'] + stats['disk_hits']) / lookups if lookups else 0.0
+        return stats
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    # ------------------------------
+    # Memory tier (callers hold the lock)
+    # ------------------------------
+    def _store(self, key, value, size, expires_at):
+        if key in self._entries:
+            self._drop(key)
+        if size > self.max_bytes:
+            return
+        self._entries[key] = (value, size, expires_at)
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._drop(oldest)
+            self.counters['evictions'] += 1
+
+    def _drop(self, key):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    # ------------------------------
+    # Disk tier
+    # ------------------------------
+    def _path(self, key):
+        return os.path.join(self.disk_dir, key[:2], key + '.pkl')
+
+    def _read_disk(self, key, now):
+        if not self.disk_dir:
+            return None, None, None
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as handle:
+                expires_at, blob = pickle.load(handle)
+            if expires_at <= now:
+                _remove_quietly(path)
+                return None, None, None
+            return pickle.loads(blob), len(blob), expires_at
+        except FileNotFoundError:
+            return None, None, None
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError, TypeError):
+            # A truncated or stale-format entry is just a miss
+            return None, None, None
+
+    def _write_disk(self, key, blob, expires_at):
+        if not self.disk_dir:
+            return
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        handle, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(handle, 'wb') as tmp:
+                pickle.dump((expires_at, blob), tmp, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except OSError:
+            _remove_quietly(tmp_path)
+            return
+
+        self._disk_writes += 1
+        if self._disk_writes % DISK_PRUNE_INTERVAL == 0:
+            self._prune_disk()
+
+    def _prune_disk(self):
+        """Drop expired files, then the least recently written ones above max_bytes"""
+        now = time.time()
+        files = []
+        for root, _, names in os.walk(self.disk_dir):
+            for name in names:
+                if not name.endswith('.pkl'):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                if stat.st_mtime + self.ttl <= now:
+                    _remove_quietly(path)
+                else:
+                    files.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            _remove_quietly(path)
+            total -= size
+
+
+def _remove_quietly(path):
+    """Remove a cache file another worker may already have removed"""
+    try:
+        os.remove(path)
+    except OSError:
+        pass
@@ -0,0 +1,103 @@
+"""
+TrustBuddy AI - Color statistics
+
+Integer histograms of an image's channels, accumulated strip by strip
+straight from the uint8 pixels. For color images a joint 256x256
+histogram is kept for each pair of channels. The per-channel histograms
+are their marginals, and every moment the checks need follows exactly
+from them: channel means, the full 3x3 covariance, and the spread of all
+channel values. The accumulator is a fixed ~1.5 MB whatever the image
+size, and later checks (banding, clipping, ...) can read the same
+histograms instead of walking the pixels again.
+"""
+import numpy as np
+
+LEVELS = 256
+PAIRS = ((0, 1), (0, 2), (1, 2))  # R/G, R/B, G/B
+_LEVEL_VALUES = np.arange(LEVELS, dtype=np.int64)
+
+
+class ColorHistograms:
+    """Channel histograms of one image, built with add(strip) over its strips.
+
+    counts is a (channels, 256) int64 array of per-channel histograms;
+    joint maps each pair in PAIRS to its (256, 256) int64 histogram
+    (rows: first channel, columns: second) for three-channel images.
+    """
+
+    def __init__(self, channels):
+        self.channels = channels
+        self.joint = ({pair: np.zeros((LEVELS, LEVELS), dtype=np.int64) for pair in PAIRS}
+                      if channels == 3 else {})
+        self._counts = np.zeros((channels, LEVELS), dtype=np.int64)
+
+    def add(self, strip):
+        """Accumulate an (h, w) or (h, w, 3) uint8 strip"""
+        if not self.joint:
+            self._counts[0] += np.bincount(strip.ravel(), minlength=LEVELS)
+            return
+        wide = strip.astype(np.uint16)  # one pass; pair keys are (first << 8) | second
+        for (first, second), histogram in self.joint.items():
+            keys = wide[:, :, first] << 8
+            keys |= wide[:, :, second]
+            histogram += np.bincount(keys.ravel(), minlength=LEVELS * LEVELS).reshape(LEVELS, LEVELS)
+
+    @property
+    def counts(self):
+        if not self.joint:
+            return self._counts
+        red_green, red_blue = self.joint[0, 1], self.joint[0, 2]
+        return np.stack([red_green.sum(axis=1), red_green.sum(axis=0), red_blue.sum(axis=0)])
+
+    @property
+    def pixels(self):
+        return int(self.counts[0].sum())
+
+    # ------------------------------
+    # Moments (exact integer sums, converted to float once)
+    # ------------------------------
+    def _sums(self):
+        """(pixels, per-channel sums, matrix of summed channel products) as Python ints"""
+        counts = self.counts
+        sums = [int(value) for value in counts @ _LEVEL_VALUES]
+        products = [[0] * self.channels for _ in range(self.channels)]
+        for channel in range(self.channels):
+            products[channel][channel] = int(counts[channel] @ (_LEVEL_VALUES * _LEVEL_VALUES))
+        for (first, second), histogram in self.joint.items():
+            products[first][second] = products[second][first] = int(_LEVEL_VALUES @ histogram @ _LEVEL_VALUES)
+        return int(counts[0].sum()), sums, products
+
+    @property
+    def means(self):
+        pixels, sums, _ = self._sums()
+        return np.array(sums, dtype=np.float64) / pixels if pixels else np.full(self.channels, np.nan)
+
+    @property
+    def covariance(self):
+        """Population covariance of the channels"""
+        pixels, sums, products = self._sums()
+        if not pixels:
+            return np.full((self.channels, self.channels), np.nan)
+        # n * sum(xy) - sum(x) * sum(y) in integers, so no precision is lost to cancellation
+        return np.array([[pixels * products[row][column] - sums[row] * sums[column]
+                          for column in range(self.channels)] for row in range(self.channels)],
+                        dtype=np.float64) / (pixels * pixels)
+
+    @property
+    def correlation(self):
+        """Pearson correlation of the channels; NaN where a channel is constant"""
+        covariance = self.covariance
+        with np.errstate(divide='ignore', invalid='ignore'):
+            std = np.sqrt(np.diag(covariance))
+            return covariance / np.outer(std, std)
+
+    @property
+    def value_std(self):
+        """Std over every channel value of every pixel, as np.std of the whole array"""
+        pixels, sums, products = self._sums()
+        values = pixels * self.channels
+        if not values:
+            return float('nan')
+        total = sum(sums)
+        squares = sum(products[channel][channel] for channel in range(self.channels))
+        return float(np.sqrt((values * squares - total * total) / (values * values)))
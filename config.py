@@ -0,0 +1,119 @@
+"""
+TrustBuddy AI - Runtime configuration
+
+Every setting can be overridden with a TRUSTBUDDY_<NAME> environment
+variable or the same key in Streamlit's secrets.toml; anything not set
+falls back to DEFAULTS.
+"""
+import os
+import sys
+
+DEFAULTS = {
+    # Skip the cosmetic "analysing..." pauses and report real progress only
+    'fast_mode': False,
+
+    # Deepfake checks on the shared thread pool, given at most this long together; a check that
+    # times out is not scored but keeps its pool thread until it returns
+    'parallel_checks': True,
+    'check_timeout_seconds': 30,
+    # Cheapest checks first, stopping once the verdict is decided (scores become lower bounds)
+    'early_exit': False,
+    # Skin rule the skin-texture check uses (see skin.py): 'rgb', 'ycbcr' or 'hsv'
+    'skin_model': 'rgb',
+    # Image size limits (see forensics.py): uploads decode reduced to fit decode_max_pixels and
+    # are refused above decode_reject_pixels; analysis_max_pixels downsamples further (0 = off)
+    'decode_max_pixels': 24_000_000,
+    'decode_reject_pixels': 80_000_000,
+    'analysis_max_pixels': 0,
+
+    # Seed for the input-derived scores that have no rule behind them (see scoring.py);
+    # every node must use the same value for results to match across a deployment
+    'scoring_seed': 0,
+
+    # Per-stage instrumentation (see instrumentation.py): timings on by default,
+    # tracemalloc peaks, JSON log lines and the Prometheus metrics file opt-in
+    'instrumentation': True,
+    'instrumentation_memory': False,
+    'perf_log': False,
+    'metrics_file': '',
+
+    # Claim knowledge base (see text_analysis.py); empty means the bundled claims.json
+    'claims_path': '',
+
+    # Domain reputation data (see url_reputation.py); empty means the bundled files
+    'domains_path': '',
+    'public_suffix_path': '',
+
+    # Bulk URL scanning (see bulk_urls.py): requests in flight overall and per host
+    'url_concurrency': 32,
+    'url_per_host': 4,
+    'url_timeout_seconds': 10,
+    'url_max_redirects': 5,
+
+    # Batch deepfake scanning (see bulk_images.py); 0 workers means one per CPU core
+    'batch_workers': 0,
+
+    # HTTP API (see api.py): analyses running at once per kind (0 = one image per CPU core),
+    # requests allowed to queue behind them, and how long one may wait before a 503
+    'api_concurrency': 8,
+    'api_image_concurrency': 0,
+    'api_queue_size': 64,
+    'api_queue_timeout_seconds': 10,
+    'api_max_body_mb': 20,
+
+    # Near-duplicate images (see phash.py): reuse the verdict of an earlier image whose perceptual
+    # hash is within this many bits (0 = off); empty path means <cache_dir>/near_duplicates.log
+    # when a cache_dir is set, otherwise memory only
+    'near_duplicate_distance': 8,
+    'near_duplicate_max_entries': 20_000,
+    'near_duplicate_path': '',
+
+    # Near-duplicate texts (see minhash.py): edited copies of a flagged text at or above this
+    # estimated Jaccard similarity reuse its verdict when no claim matches them (0 = off);
+    # each kept text costs about 500 bytes
+    'near_duplicate_text_threshold': 0.7,
+    'near_duplicate_text_max_entries': 50_000,
+
+    # Result cache (see cache.py)
+    'cache_max_mb': 64,
+    'cache_ttl_seconds': 6 * 60 * 60,
+    'cache_dir': '',
+}
+
+
+def get_setting(name):
+    """Raw setting value: environment first, then st.secrets, then DEFAULTS"""
+    key = f"TRUSTBUDDY_{name.upper()}"
+    value = os.environ.get(key)
+    if value is None:
+        value = _secret(key)
+    if value is None:
+        return DEFAULTS[name]
+    return value
+
+
+def _secret(key):
+    # Only consult secrets inside a Streamlit app; headless tools shouldn't pay the import
+    streamlit = sys.modules.get('streamlit')
+    if streamlit is None:
+        return None
+    try:
+        return streamlit.secrets.get(key)
+    except Exception:
+        # No secrets.toml, or it failed to parse: fall back to the defaults
+        return None
+
+
+def get_int(name):
+    return int(get_setting(name))
+
+
+def get_float(name):
+    return float(get_setting(name))
+
+
+def get_bool(name):
+    value = get_setting(name)
+    if isinstance(value, str):
+        return value.strip().lower() in ('1', 'true', 'yes', 'on')
+    return bool(value)
@@ -0,0 +1,923 @@
+"""
+TrustBuddy AI - Deepfake forensics engine
+
+The image checks behind the Deepfake Detector tab, importable outside of a
+Streamlit rerun so they can be benchmarked, cached or run in workers.
+"""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError, as_completed
+from dataclasses import dataclass, field
+from io import BytesIO
+
+import numpy as np
+from PIL import Image
+
+import color_stats
+import config
+import instrumentation
+import metadata
+import phash
+import skin
+
+ENGINE_VERSION = "1.6"
+
+# ==============================
+# Detection constants
+# ==============================
+AI_DIMENSIONS = {(512, 512), (1024, 1024), (768, 768)}
+SUSPICIOUS_NAMES = ['generated', 'ai', 'dalle', 'midjourney', 'stable', 'diffusion', 'gpt', 'artificial', 'photo']
+
+# Block repetition: sampled block cap (hard latency ceiling) and similarity matrix budget
+MAX_BLOCKS = 2048
+BLOCK_MEMORY_BUDGET = 32 * 1024 * 1024
+
+# Bounded-memory analysis: the analysis image is downsampled to ANALYSIS_MAX_PIXELS
+# (None keeps the decoded resolution), and images above TILE_PIXELS stream through
+# the checks in TILE_ROWS strips
+ANALYSIS_MAX_PIXELS = config.get_int('analysis_max_pixels') or None
+TILE_PIXELS = 4_000_000
+TILE_ROWS = 256
+
+# Spectral check: one FFT_SIZE x FFT_SIZE window of native pixels from the image centre,
+# so its cost is the same for every upload. Low frequencies are those within
+# SPECTRUM_LOW_RADIUS cycles per window. Upsampling layers leave isolated peaks in the
+# upper half of the spectrum, which stand SPECTRUM_PEAK_RISE orders of magnitude above
+# the azimuthal mean of their ring; in natural images the highest is about 1.5
+FFT_SIZE = 512
+SPECTRUM_LOW_RADIUS = 10
+SPECTRUM_PEAK_RISE = 3.5
+
+# Skin rule for the skin-texture check: one of skin.RULES
+SKIN_MODEL = config.get_setting('skin_model')
+
+# Upload decoding: larger images are decoded reduced to fit DECODE_MAX_PIXELS (JPEGs
+# straight from the DCT at 1/2, 1/4 or 1/8 scale via draft()), and an upload that
+# would still decode to more than DECODE_REJECT_PIXELS is refused before any pixel
+# is decoded. PIL itself refuses anything over ~179MP as a decompression bomb.
+DECODE_MAX_PIXELS = config.get_int('decode_max_pixels')
+DECODE_REJECT_PIXELS = config.get_int('decode_reject_pixels')
+PREVIEW_SIZE = (1024, 1024)
+
+# What PIL raises for corrupt or truncated uploads (ImageTooLarge is a ValueError)
+DECODE_ERRORS = (OSError, SyntaxError, ValueError, EOFError)
+# Single-band modes wider than 8 bits, e.g. 16-bit grayscale PNG / TIFF; rescaled, not clipped, to L
+WIDE_MODES = ('I', 'I;16', 'I;16L', 'I;16B', 'I;16N')
+
+
+class ImageTooLarge(ValueError):
+    """The upload would decode to more pixels than DECODE_REJECT_PIXELS"""
+
+
+@dataclass
+class CheckResult:
+    """Outcome of a single forensic check"""
+    name: str
+    points: int = 0
+    details: list = field(default_factory=list)
+    seconds: float = 0.0
+    timed_out: bool = False
+    cpu_seconds: float = None
+    peak_bytes: int = None
+
+
+@dataclass
+class ForensicsResult:
+    """Structured verdict returned by analyze_image()"""
+    width: int
+    height: int
+    ai_indicators: int
+    authenticity_score: int
+    suspicion_score: int
+    verdict: str
+    verdict_color: str
+    detection_details: list
+    checks: list
+    seconds: float
+    metadata_only: bool = False
+    skipped: list = field(default_factory=list)  # checks early exit didn't need; see run_checks_early_exit
+    near_duplicate: int = None  # Hamming distance to the earlier image whose verdict was reused
+
+    @property
+    def complete(self):
+        """False when the verdict isn't final: a check timed out, or pixels weren't analyzed"""
+        return not self.metadata_only and not any(check.timed_out for check in self.checks)
+
+    @property
+    def timings(self):
+        return {check.name: check.seconds for check in self.checks}
+
+    def to_dict(self):
+        return {
+            'width': self.width,
+            'height': self.height,
+            'ai_indicators': self.ai_indicators,
+            'authenticity_score': self.authenticity_score,
+            'suspicion_score': self.suspicion_score,
+            'verdict': self.verdict,
+            'verdict_color': self.verdict_color,
+            'detection_details': list(self.detection_details),
+            'checks': [
+                {'name': c.name, 'points': c.points, 'details': list(c.details), 'seconds': c.seconds,
+                 'timed_out': c.timed_out, 'cpu_seconds': c.cpu_seconds, 'peak_bytes': c.peak_bytes}
+                for c in self.checks
+            ],
+            'seconds': self.seconds,
+            'metadata_only': self.metadata_only,
+            'skipped': list(self.skipped),
+            'near_duplicate': self.near_duplicate,
+        }
+
+
+@dataclass
+class DecodedImage:
+    """An upload decoded once, within the pixel budget, to RGB or L"""
+    image: Image.Image
+    width: int  # dimensions declared by the file; image may be smaller
+    height: int
+    format: str = None
+    metadata: 'metadata.ImageMetadata' = None
+
+    @property
+    def reduced(self):
+        return self.image.size != (self.width, self.height)
+
+    def preview(self, size=PREVIEW_SIZE):
+        """Display-sized copy, so the browser never receives the full-resolution pixels"""
+        thumbnail = self.image.copy()
+        thumbnail.thumbnail(size, Image.BOX)
+        return thumbnail
+
+
+class Moments:
+    """Running count / sum / sum of squares, for std over streamed values"""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.squares = 0.0
+
+    def add(self, values):
+        values = values.ravel()
+        self.count += values.size
+        self.total += float(np.sum(values, dtype=np.float64))
+        self.squares += float(np.dot(values, values.astype(np.float64)))
+
+    def add_counts(self, values, counts):
+        """Add a histogram: counts[i] occurrences of values[i]"""
+        counts = counts.astype(np.float64)
+        self.count += int(counts.sum())
+        self.total += float(np.dot(counts, values))
+        self.squares += float(np.dot(counts, values * values))
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else float('nan')
+
+    @property
+    def std(self):
+        if not self.count:
+            return float('nan')
+        mean = self.total / self.count
+        return float(np.sqrt(max(self.squares / self.count - mean * mean, 0.0)))
+
+
+class ImageContext:
+    """Shared, bounded-memory view of one image for the checks.
+
+    The checks never hold a full-resolution array: they pull horizontal
+    strips of the analysis image through strips(), or their gray planes
+    through gray_strips(), so peak memory is set by the strip size rather
+    than the upload. Small images come through as a single strip whose
+    array and gray plane are each converted once and shared by every check.
+
+    decoded is a DecodedImage (see decode_image). max_pixels downsamples
+    the analysis image further (None keeps the decoded resolution);
+    tile_rows forces a strip height, otherwise images above TILE_PIXELS are
+    streamed in TILE_ROWS strips.
+    """
+
+    def __init__(self, decoded, filename=None, max_pixels=None, tile_rows=None):
+        self.image = decoded.image
+        self.metadata = decoded.metadata
+        self.filename = filename
+        # Dimensions of the upload itself; the analysis image may be smaller
+        self.width, self.height = decoded.width, decoded.height
+        self.analysis_image = downsample(self.image, max_pixels)
+        # Decode up front: checks may read the image concurrently from pool threads
+        self.image.load()
+        self.analysis_image.load()
+        self.analysis_width, self.analysis_height = self.analysis_image.size
+        self.is_color = len(self.analysis_image.getbands()) > 1
+
+        if tile_rows is None and self.analysis_width * self.analysis_height > TILE_PIXELS:
+            tile_rows = TILE_ROWS
+        self.tile_rows = tile_rows
+        self._full_array = None
+        self._full_array_lock = threading.Lock()
+        self._full_gray = None
+        self._full_gray_lock = threading.Lock()
+        self._histograms = None
+        self._histograms_lock = threading.Lock()
+
+    @property
+    def tiled(self):
+        return self.tile_rows is not None and self.tile_rows < self.analysis_height
+
+    def strips(self, multiple=1):
+        """Yield (top_row, uint8 array) bands covering the analysis image.
+
+        Strip heights are rounded down to a multiple of `multiple` so that
+        block-aligned checks never see a block split across two strips.
+        """
+        if not self.tiled:
+            with self._full_array_lock:
+                if self._full_array is None:
+                    self._full_array = np.asarray(self.analysis_image)
+            yield 0, self._full_array
+            return
+
+        rows = max(multiple, self.tile_rows // multiple * multiple)
+        for top in range(0, self.analysis_height, rows):
+            bottom = min(top + rows, self.analysis_height)
+            yield top, np.asarray(self.analysis_image.crop((0, top, self.analysis_width, bottom)))
+
+    def gray_strips(self, multiple=1):
+        """strips() as gray planes (see strip_gray); the checks only read them"""
+        if self.tiled:
+            for top, strip in self.strips(multiple):
+                yield top, strip_gray(strip)
+            return
+        yield 0, self.full_gray()
+
+    def full_gray(self):
+        """Gray plane of an untiled analysis image, converted on first use and shared by the checks"""
+        with self._full_gray_lock:
+            if self._full_gray is None:
+                _, strip = next(self.strips())
+                gray = strip_gray(strip)
+                gray.flags.writeable = False
+                self._full_gray = gray
+            return self._full_gray
+
+    def histograms(self):
+        """color_stats.ColorHistograms of the analysis image, built on first use and shared by the checks"""
+        with self._histograms_lock:
+            if self._histograms is None:
+                histograms = color_stats.ColorHistograms(3 if self.is_color else 1)
+                for _, strip in self.strips():
+                    histograms.add(strip)
+                self._histograms = histograms
+            return self._histograms
+
+
+class HeaderContext:
+    """What the header-only checks read from an ImageContext, without any pixels"""
+
+    def __init__(self, meta, filename=None):
+        self.metadata = meta
+        self.filename = filename
+        self.width, self.height = meta.width, meta.height
+        self.analysis_width = self.analysis_height = 0
+
+
+def downsample(image, max_pixels):
+    """Shrink an image to at most max_pixels, keeping its mode and aspect ratio"""
+    width, height = image.size
+    if not max_pixels or width * height <= max_pixels:
+        return image
+    scale = (max_pixels / (width * height)) ** 0.5
+    size = (max(1, int(width * scale)), max(1, int(height * scale)))
+    # Palette and bilevel images carry indices, not intensities, so never average them
+    resample = Image.NEAREST if image.mode in ('P', '1') else Image.BOX
+    return image.resize(size, resample)
+
+
+def gray_grid(ctx, size=phash.GRID_SIZE):
+    """size x size area-averaged gray plane of the analysis image, for the perceptual hash"""
+    return strip_gray(np.asarray(ctx.analysis_image.resize((size, size), Image.BOX)))
+
+
+def strip_gray(strip):
+    """Grayscale plane of a strip: float32 channel mean, or the raw band for single-band images"""
+    if strip.ndim == 2:
+        return strip
+    gray = strip.sum(axis=2, dtype=np.float32)
+    gray /= strip.shape[2]
+    return gray
+
+
+# ==============================
+# Individual checks
+# ==============================
+def check_dimensions(ctx):
+    """Check 1: AI generators favour a handful of square output sizes"""
+    if (ctx.width, ctx.height) in AI_DIMENSIONS:
+        return 30, ["🚩 Suspicious dimensions: Common AI generation size detected"]
+    return 0, []
+
+
+def check_filename(ctx):
+    """Check 2: filenames left behind by generation tools"""
+    if ctx.filename is None:
+        return 0, []
+    filename = ctx.filename.lower()
+    if any(name in filename for name in SUSPICIOUS_NAMES):
+        return 40, [f"🚩 Suspicious filename pattern: '{filename}' contains AI-related keywords"]
+    return 0, []
+
+
+def color_statistics(ctx):
+    """(avg |corr| of R/G/B, std over all channel values), from the shared channel histograms"""
+    histograms = ctx.histograms()
+    corr = histograms.correlation
+    avg_correlation = (abs(corr[0, 1]) + abs(corr[0, 2]) + abs(corr[1, 2])) / 3
+    return avg_correlation, histograms.value_std
+
+
+def check_color(ctx):
+    """Check 3: channel correlation and saturation spread"""
+    if not ctx.is_color:
+        return 0, []
+    points, details = 0, []
+    avg_correlation, saturation = color_statistics(ctx)
+
+    # AI images often have unnaturally high color correlation
+    if avg_correlation > 0.8:
+        points += 35
+        details.append(f"🚩 Unnatural color correlation: {avg_correlation:.2f} (AI threshold: >0.8)")
+
+    if saturation < 20 or saturation > 80:  # Too uniform or too varied
+        points += 25
+        details.append(f"🚩 Abnormal saturation patterns: {saturation:.1f}")
+    return points, details
+
+
+def gradient_statistics(ctx):
+    """Std of |horizontal| and |vertical| gray differences, carried across strip seams"""
+    grad_x, grad_y = Moments(), Moments()
+    previous_row = None
+    for _, gray in ctx.gray_strips():
+        if previous_row is not None:
+            gray = np.concatenate([previous_row, gray])
+            grad_x.add(np.abs(np.diff(gray[1:], axis=1)))
+        else:
+            grad_x.add(np.abs(np.diff(gray, axis=1)))
+        grad_y.add(np.abs(np.diff(gray, axis=0)))
+        previous_row = gray[-1:]
+    return grad_x.std, grad_y.std
+
+
+def check_gradients(ctx):
+    """Check 4: AI often creates very consistent gradients"""
+    grad_x_std, grad_y_std = gradient_statistics(ctx)
+    if grad_x_std < 5 or grad_y_std < 5:
+        return 30, ["🚩 Artificial gradient uniformity detected"]
+    return 0, []
+
+
+def _spectrum_layout(size):
+    """Ring (radius in cycles per window) and half-plane multiplicity of every rfft2 coefficient"""
+    rows = np.fft.fftfreq(size, 1.0 / size)[:, None]
+    columns = np.fft.rfftfreq(size, 1.0 / size)[None, :]
+    radius = np.rint(np.hypot(rows, columns)).astype(np.intp)
+    # Past ~0.69 * size the rings only clip the corners' tips; pool them into one
+    radius = np.minimum(radius, int(0.69 * size))
+    # rfft2 stores one of each conjugate pair: columns other than DC and Nyquist stand for two
+    weight = np.full(radius.shape, 2.0, dtype=np.float32)
+    weight[:, 0] = weight[:, -1] = 1.0
+    return radius.ravel(), weight.ravel()
+
+
+SPECTRUM_RADIUS, SPECTRUM_WEIGHT = _spectrum_layout(FFT_SIZE)
+SPECTRUM_RING_WEIGHT = np.bincount(SPECTRUM_RADIUS, weights=SPECTRUM_WEIGHT)
+# Coefficients grouped by ring, for per-ring maxima with one reduceat
+SPECTRUM_ORDER = np.argsort(SPECTRUM_RADIUS, kind='stable')
+SPECTRUM_RING_STARTS = np.searchsorted(SPECTRUM_RADIUS[SPECTRUM_ORDER], np.arange(len(SPECTRUM_RING_WEIGHT)))
+# Rings searched for peaks: the upper half of the spectrum, corners included
+SPECTRUM_PEAK_RINGS = np.arange(len(SPECTRUM_RING_WEIGHT)) >= FFT_SIZE // 4
+
+
+def spectral_window(ctx):
+    """Hann-windowed float32 gray of the central FFT_SIZE square, zero-padded to FFT_SIZE when smaller"""
+    width, height = ctx.analysis_width, ctx.analysis_height
+    crop_width, crop_height = min(width, FFT_SIZE), min(height, FFT_SIZE)
+    left, top = (width - crop_width) // 2, (height - crop_height) // 2
+    if ctx.tiled:
+        gray = strip_gray(np.asarray(ctx.analysis_image.crop((left, top, left + crop_width, top + crop_height))))
+    else:
+        gray = ctx.full_gray()[top:top + crop_height, left:left + crop_width]
+    gray = gray.astype(np.float32, copy=False)
+    window = np.outer(np.hanning(crop_height), np.hanning(crop_width)).astype(np.float32)
+    padded = np.zeros((FFT_SIZE, FFT_SIZE), dtype=np.float32)
+    padded[:crop_height, :crop_width] = gray * window
+    return padded
+
+
+def spectral_profile(ctx):
+    """(azimuthal mean log10 power by ring, highest peak over its ring's mean, low-frequency magnitude share)"""
+    spectrum = np.fft.rfft2(spectral_window(ctx)).astype(np.complex64, copy=False).ravel()
+    power = spectrum.real * spectrum.real + spectrum.imag * spectrum.imag
+    magnitude = np.sqrt(power) * SPECTRUM_WEIGHT
+    total = float(magnitude.sum())
+    low_share = float(magnitude[SPECTRUM_RADIUS < SPECTRUM_LOW_RADIUS].sum()) / total if total else 1.0
+
+    # Log power, so one strong peak barely moves its ring's mean
+    log_power = np.log10(power + 1e-3)
+    profile = np.bincount(SPECTRUM_RADIUS, weights=log_power * SPECTRUM_WEIGHT) / SPECTRUM_RING_WEIGHT
+    ring_max = np.maximum.reduceat(log_power[SPECTRUM_ORDER], SPECTRUM_RING_STARTS)
+    peak = float((ring_max - profile)[SPECTRUM_PEAK_RINGS].max())
+    return profile, peak, low_share
+
+
+def check_frequency(ctx):
+    """Check 5: spectral signature of a windowed centre crop.
+
+    Flags energy concentrated in the lowest frequencies (over-smooth
+    images), and isolated high-frequency peaks far above the azimuthal
+    power spectrum, the periodic trace upsampling layers leave.
+    """
+    _, peak, low_share = spectral_profile(ctx)
+    details = []
+    if low_share > 0.8:
+        details.append("🚩 Artificial frequency distribution detected")
+    if peak > SPECTRUM_PEAK_RISE:
+        details.append("🚩 High-frequency spectral peaks typical of upsampling artifacts")
+    return (25, details) if details else (0, [])
+
+
+def check_skin_texture(ctx):
+    """Check 6: AI often generates unnaturally smooth skin"""
+    width, height = ctx.analysis_width, ctx.analysis_height
+    if not (height > 100 and width > 100) or not ctx.is_color:
+        return 0, []
+
+    model = skin.model(SKIN_MODEL)
+    histogram = np.zeros(skin.CHANNEL_SUMS, dtype=np.int64)
+    for _, strip in ctx.strips():
+        histogram += model.histogram(strip)
+    # Gray is the channel mean, so each r+g+b bin is one gray level
+    skin_gray = Moments()
+    skin_gray.add_counts(np.arange(skin.CHANNEL_SUMS) / 3.0, histogram)
+
+    if skin_gray.count > (height * width * 0.1):  # If significant skin area
+        if skin_gray.std < 8:
+            return 35, ["🚩 Unnatural skin texture smoothness detected"]
+    return 0, []
+
+
+def check_metadata(ctx):
+    """Check 7: AI images often lack proper camera metadata, and some declare themselves"""
+    meta = ctx.metadata
+    if meta.exif is None:
+        return 15, ["🚩 Unable to read image metadata"]
+    points, details = 0, []
+    if not meta.has_camera_info and len(meta.exif) == 0:
+        points, details = 20, ["🚩 Missing camera metadata (common in AI-generated images)"]
+    markers = meta.ai_markers
+    if markers:
+        points += 40
+        details.extend(f"🚩 Provenance metadata: {marker}" for marker in markers)
+    elif meta.c2pa:
+        details.append("ℹ️ C2PA content credentials present - inspect them with a C2PA verifier")
+    return points, details
+
+
+def block_layout(height, width, block_size):
+    """(rows, cols) of non-overlapping blocks, laid out like the original nested loop.
+
+    The loop ran range(0, size - block_size, block_size), so the last block
+    row/column is dropped even when it would fit exactly.
+    """
+    return len(range(0, height-block_size, block_size)), len(range(0, width-block_size, block_size))
+
+
+def sample_blocks(block_count, max_blocks=MAX_BLOCKS):
+    """Indices of the blocks to compare: all of them, or an evenly strided subset"""
+    index = np.arange(block_count)
+    if block_count > max_blocks:
+        index = index[np.linspace(0, block_count - 1, max_blocks).astype(np.intp)]
+    return index
+
+
+def mean_abs_correlation(blocks, memory_budget=BLOCK_MEMORY_BUDGET):
+    """Mean |Pearson correlation| over all pairs of rows in a (n, pixels) block matrix.
+
+    Constant blocks are skipped, as np.corrcoef would return NaN for them.
+    Returns None when fewer than two usable blocks remain.
+    """
+    # Normalize once: centred, unit-norm rows turn every correlation into a dot product
+    z = blocks.astype(np.float64)
+    z -= z.mean(axis=1, keepdims=True)
+    norms = np.sqrt(np.einsum('ij,ij->i', z, z))
+    z = z[norms > 0]
+    z /= norms[norms > 0, None]
+    usable = len(z)
+    if usable < 2:
+        return None
+
+    # Walk the upper triangle in row chunks through one reused buffer, so the normalized
+    # blocks plus the similarity rows stay within the budget: products and abs() are written in place
+    chunk = max(1, min(usable, (memory_budget - z.nbytes) // (usable * 8)))
+    buffer = np.empty(chunk * usable)
+    total = 0.0
+    for start in range(0, usable, chunk):
+        stop = min(start + chunk, usable)
+        sims = buffer[:(stop - start) * (usable - start)].reshape(stop - start, usable - start)
+        np.matmul(z[start:stop], z[start:].T, out=sims)
+        np.abs(sims, out=sims)
+        # The leading square is symmetric: its strict upper triangle is half of all minus the diagonal
+        square = sims[:, :stop-start]
+        total += (square.sum() - np.trace(square)) / 2 + sims[:, stop-start:].sum()
+
+    return total / (usable * (usable - 1) / 2)
+
+
+def block_similarity(gray, block_size, max_blocks=MAX_BLOCKS, memory_budget=BLOCK_MEMORY_BUDGET):
+    """Mean |corr| between the blocks of an in-memory gray array; returns (mean, block_count)"""
+    rows, cols = block_layout(*gray.shape, block_size)
+    index = sample_blocks(rows * cols, max_blocks)
+    grid = gray[:rows*block_size, :cols*block_size].reshape(rows, block_size, cols, block_size)
+    blocks = grid[index // cols, :, index % cols, :].reshape(len(index), -1)
+    return mean_abs_correlation(blocks, memory_budget), rows * cols
+
+
+def check_block_repetition(ctx):
+    """Check 8: AI sometimes creates subtle repetitive patterns"""
+    width, height = ctx.analysis_width, ctx.analysis_height
+    if not (height > 50 and width > 50):
+        return 0, []
+    block_size = min(16, height//4, width//4)
+    rows, cols = block_layout(height, width, block_size)
+    if rows * cols <= 4:
+        return 0, []
+
+    # Gather only the sampled blocks, strip by strip (strips are block aligned)
+    index = sample_blocks(rows * cols)
+    block_rows, block_cols = index // cols, index % cols
+    blocks = []
+    for top, gray in ctx.gray_strips(multiple=block_size):
+        first, last = top // block_size, (top + len(gray)) // block_size
+        picked = (block_rows >= first) & (block_rows < min(last, rows))
+        if not picked.any():
+            continue
+        grid = gray[:(last-first)*block_size, :cols*block_size].reshape(last-first, block_size, cols, block_size)
+        blocks.append(grid[block_rows[picked] - first, :, block_cols[picked], :].reshape(picked.sum(), -1))
+
+    similarity = mean_abs_correlation(np.concatenate(blocks)) if blocks else None
+    if similarity is not None and similarity > 0.7:
+        return 30, ["🚩 Repetitive pattern artifacts detected"]
+    return 0, []
+
+
+# Evaluation order matches the original Tab 4 script so detection_details read the same
+CHECKS = [
+    ('dimensions', check_dimensions),
+    ('filename', check_filename),
+    ('color', check_color),
+    ('gradients', check_gradients),
+    ('frequency', check_frequency),
+    ('skin_texture', check_skin_texture),
+    ('metadata', check_metadata),
+    ('block_repetition', check_block_repetition),
+]
+
+# Checks that only need the file header; analyze_metadata() runs just these
+HEADER_CHECKS = ['dimensions', 'filename', 'metadata']
+
+# Most points each check can award; keep in step with the check functions above
+CHECK_MAX_POINTS = {
+    'dimensions': 30,
+    'filename': 40,
+    'color': 60,
+    'gradients': 30,
+    'frequency': 25,
+    'skin_texture': 35,
+    'metadata': 60,
+    'block_repetition': 30,
+}
+
+# Cheapest first, from bench.py timings: header-only checks, the bounded FFT crop, the
+# single-pass strip statistics, then the block correlation matrix
+COST_ORDER = ['dimensions', 'filename', 'metadata', 'frequency', 'skin_texture', 'gradients', 'color',
+              'block_repetition']
+
+
+# ==============================
+# Scoring
+# ==============================
+def score_verdict(ai_indicators):
+    """Map the summed indicator points to (authenticity, suspicion, verdict, color, notes)"""
+    authenticity_score = max(5, 100 - ai_indicators)
+    notes = []
+
+    if authenticity_score >= 75:
+        verdict, verdict_color = "✅ LIKELY GENUINE", "green"
+    elif authenticity_score >= 50:
+        verdict, verdict_color = "🟡 SUSPICIOUS - VERIFY CAREFULLY", "orange"
+    elif authenticity_score >= 25:
+        verdict, verdict_color = "🟠 LIKELY AI-GENERATED", "red"
+    else:
+        verdict, verdict_color = "🔴 AI-GENERATED DETECTED", "darkred"
+
+    # Override for high AI indicator scores
+    if ai_indicators >= 60:
+        verdict = "🤖 AI-GENERATED IMAGE CONFIRMED"
+        authenticity_score = min(authenticity_score, 15)
+        notes.append("⚠️ Multiple strong AI generation indicators detected")
+    elif ai_indicators >= 40:
+        verdict = "🟠 HIGH PROBABILITY AI-GENERATED"
+        authenticity_score = min(authenticity_score, 30)
+        notes.append("⚠️ Several AI generation indicators detected")
+
+    return authenticity_score, 100 - authenticity_score, verdict, verdict_color, notes
+
+
+# ==============================
+# Entry point
+# ==============================
+def load_image(source):
+    """Accept a PIL image, raw bytes or a file-like object; opens lazily (header only)"""
+    if isinstance(source, Image.Image):
+        return source
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        source = BytesIO(source)
+    try:
+        return Image.open(source)
+    except Image.DecompressionBombError as error:
+        raise ImageTooLarge(str(error)) from None
+
+
+def image_metadata(image):
+    """Header metadata for a lazily opened image, read from its stream when it still has one"""
+    stream = getattr(image, 'fp', None)
+    if stream is not None and hasattr(stream, 'seek'):
+        return metadata.read_metadata(stream, image)
+    return metadata.from_image(image)
+
+
+def normalized_mode(image):
+    """'L' for single-channel images (with or without alpha), 'RGB' for everything else"""
+    return 'L' if image.mode in ('1', 'L', 'LA', 'La', 'F') + WIDE_MODES else 'RGB'
+
+
+def rescale_wide(image):
+    """8-bit L copy of a WIDE_MODES image, mapping 0..65535 onto 0..255 (convert() would clip at 255)"""
+    if image.mode != 'I':
+        image = image.convert('I')
+    return image.point(lambda value: value * (1 / 257) + 0.5).convert('L')
+
+
+def decode_image(source, max_pixels=DECODE_MAX_PIXELS, reject_pixels=DECODE_REJECT_PIXELS):
+    """Decode an upload within the pixel budget and return a DecodedImage.
+
+    Only the header is read until the decode size is settled: JPEGs over
+    max_pixels are set up to decode at a reduced DCT scale via draft(),
+    and if the size still to be decoded exceeds reject_pixels the upload
+    is refused with ImageTooLarge. Other formats are decoded in full and
+    shrunk with an integer reduce() plus a final box resample. The result
+    is converted to RGB or L exactly once.
+    """
+    if isinstance(source, DecodedImage):
+        return source
+    image = load_image(source)
+    width, height, file_format = image.width, image.height, image.format
+    meta = image_metadata(image)
+    mode = normalized_mode(image)
+    if max_pixels and width * height > max_pixels:
+        # draft() decodes at the largest 1/2^n scale still covering the requested size;
+        # asking for half the budgeted side lands between max_pixels / 4 and max_pixels.
+        # A no-op for formats other than JPEG.
+        scale = (max_pixels / (width * height)) ** 0.5 / 2
+        image.draft(mode, (max(1, int(width * scale)), max(1, int(height * scale))))
+    if reject_pixels and image.width * image.height > reject_pixels:
+        raise ImageTooLarge(f"{width}x{height} image exceeds the {reject_pixels:,} pixel decode limit")
+
+    with instrumentation.stage("forensics.decode", width * height):
+        image.load()
+        if image.mode in WIDE_MODES:
+            image = rescale_wide(image)
+
+        if max_pixels and image.width * image.height > max_pixels:
+            factor = int((image.width * image.height / max_pixels) ** 0.5)
+            if factor >= 2:
+                image = image.reduce(factor)
+        if image.mode != mode:
+            image = image.convert(mode)
+        image = downsample(image, max_pixels)
+    return DecodedImage(image, width, height, file_format, meta)
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def shared_executor():
+    """Process-wide thread pool for parallel checks, sized from the CPU count.
+
+    NumPy releases the GIL for the heavy parts of every check, so threads
+    overlap them without pickling the image into worker processes. A check
+    that times out keeps its worker until it returns (see run_checks), so
+    the pool has len(CHECKS) threads beyond one per core: a whole request's
+    worth of hung checks cannot starve the requests queued behind it.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=(os.cpu_count() or 2) + len(CHECKS),
+                                           thread_name_prefix="forensics")
+        return _executor
+
+
+def _run_check(name, check, ctx):
+    started = time.perf_counter()
+    with instrumentation.stage(f"forensics.{name}", ctx.analysis_width * ctx.analysis_height) as measured:
+        points, details = check(ctx)
+    result = CheckResult(name, points, details, time.perf_counter() - started)
+    if measured.record is not None:
+        result.cpu_seconds = measured.record['cpu_seconds']
+        result.peak_bytes = measured.record['peak_bytes']
+    return result
+
+
+def run_checks(ctx, executor=None, check_timeout=None, progress=None):
+    """Run CHECKS against ctx, sequentially or on an executor; results keep CHECKS order.
+
+    With an executor, the checks share one budget of check_timeout seconds
+    from submission, including any time queued behind other requests. When
+    it runs out, checks that have not started are cancelled, and those still
+    running are reported as timed out and score nothing. A running check
+    cannot be interrupted: it no longer holds up the verdict, but it keeps
+    its executor thread until it returns.
+    """
+    if executor is None:
+        checks = []
+        for name, check in CHECKS:
+            checks.append(_run_check(name, check, ctx))
+            if progress is not None:
+                progress(len(checks), len(CHECKS), name)
+        return checks
+
+    futures = {executor.submit(_run_check, name, check, ctx): name for name, check in CHECKS}
+    results = {}
+    try:
+        for future in as_completed(futures, timeout=check_timeout):
+            result = future.result()
+            results[result.name] = result
+            if progress is not None:
+                progress(len(results), len(CHECKS), result.name)
+    except TimeoutError:
+        for future, name in futures.items():
+            if name not in results:
+                future.cancel()
+                label = name.replace('_', ' ').capitalize()
+                detail = f"⏱️ {label} check timed out after {check_timeout:g}s - not scored"
+                results[name] = CheckResult(name, 0, [detail], check_timeout, timed_out=True)
+    return [results[name] for name, _ in CHECKS]
+
+
+def verdict_band(ai_indicators):
+    """(verdict, verdict_color) for a point total"""
+    return score_verdict(ai_indicators)[2:4]
+
+
+def run_checks_early_exit(ctx, progress=None):
+    """Run CHECKS in COST_ORDER, stopping once the remaining ones can't change the verdict.
+
+    Points only ever add up, so after each check the final total lies
+    between the points so far and that plus CHECK_MAX_POINTS of every check
+    still to run; once the verdict and its colour are the same across that
+    whole range, the rest is skipped. Returns (results in CHECKS order,
+    names of the skipped checks).
+    """
+    functions = dict(CHECKS)
+    results = {}
+    remaining = sum(CHECK_MAX_POINTS.values())
+    for name in COST_ORDER:
+        result = _run_check(name, functions[name], ctx)
+        results[name] = result
+        remaining -= CHECK_MAX_POINTS[name]
+        if progress is not None:
+            progress(len(results), len(CHECKS), name)
+        low = sum(r.points for r in results.values())
+        band = verdict_band(low)
+        if remaining and all(verdict_band(total) == band for total in range(low + 1, low + remaining + 1)):
+            break
+    skipped = [name for name in COST_ORDER if name not in results]
+    return [results[name] for name, _ in CHECKS if name in results], skipped
+
+
+def analyze_image(source, filename=None, max_pixels=ANALYSIS_MAX_PIXELS, tile_rows=None, progress=None,
+                  executor=None, check_timeout=None, early_exit=False, near_duplicates=None):
+    """Run every forensic check on an image and return a ForensicsResult.
+
+    source is a DecodedImage, or anything decode_image() accepts.
+    max_pixels caps the analysis resolution and tile_rows forces strip-wise
+    streaming; see ImageContext. progress, if given, is called as
+    progress(done, total, check_name) after each check completes. Passing
+    an executor (e.g. shared_executor()) runs the checks in parallel with
+    an optional per-check timeout; see run_checks.
+
+    early_exit runs the checks sequentially, cheapest first, and stops as
+    soon as the verdict is decided (see run_checks_early_exit). The verdict
+    is the one the full run would give; the scores are lower bounds, and
+    the skipped checks are listed on the result.
+
+    near_duplicates is a phash.PerceptualIndex: an image within its distance
+    of one analyzed before reuses that image's pixel-check results, and
+    only the HEADER_CHECKS run on the new upload before it is rescored.
+    Complete results with no skipped check are added to it.
+    """
+    started = time.perf_counter()
+    decoded = decode_image(source)
+    with instrumentation.stage("forensics.prepare", decoded.image.width * decoded.image.height):
+        ctx = ImageContext(decoded, filename, max_pixels, tile_rows)
+    if near_duplicates is not None:
+        with instrumentation.stage("forensics.phash"):
+            image_hash = phash.perceptual_hash(gray_grid(ctx))
+            match = near_duplicates.lookup(image_hash)
+        if match is not None:
+            return reused_verdict(ctx, *match, started)
+    if early_exit:
+        checks, skipped = run_checks_early_exit(ctx, progress)
+    else:
+        checks, skipped = run_checks(ctx, executor, check_timeout, progress), []
+    instrumentation.export_metrics()
+
+    result = build_result(ctx, checks, started, skipped)
+    if near_duplicates is not None and result.complete and not result.skipped:
+        # Only the pixel checks, and only from a full evaluation: the header checks belong to
+        # each upload's own bytes and name, and early exit may have skipped pixel checks
+        near_duplicates.add(image_hash, [(c.name, c.points, c.details) for c in checks
+                                         if c.name not in HEADER_CHECKS])
+    return result
+
+
+def build_result(ctx, checks, started, skipped=(), near_duplicate=None):
+    """Score the check results into a ForensicsResult"""
+    ai_indicators = sum(c.points for c in checks)
+    detection_details = [detail for c in checks for detail in c.details]
+    authenticity_score, suspicion_score, verdict, verdict_color, notes = score_verdict(ai_indicators)
+    if skipped:
+        labels = ', '.join(name.replace('_', ' ') for name in skipped)
+        notes.append(f"⏭️ Verdict decided early - skipped {len(skipped)} check(s) that could not change it: {labels}")
+
+    return ForensicsResult(
+        width=ctx.width,
+        height=ctx.height,
+        ai_indicators=ai_indicators,
+        authenticity_score=authenticity_score,
+        suspicion_score=suspicion_score,
+        verdict=verdict,
+        verdict_color=verdict_color,
+        detection_details=detection_details + notes,
+        checks=checks,
+        seconds=time.perf_counter() - started,
+        skipped=list(skipped),
+        near_duplicate=near_duplicate,
+    )
+
+
+def reused_verdict(ctx, distance, pixel_checks, started):
+    """ForensicsResult for a near-duplicate: its own header checks plus the earlier image's pixel checks"""
+    results = {name: CheckResult(name, points, list(details)) for name, points, details in pixel_checks}
+    results.update((name, _run_check(name, check, ctx)) for name, check in CHECKS if name in HEADER_CHECKS)
+    checks = [results[name] for name, _ in CHECKS if name in results]
+    instrumentation.export_metrics()
+    result = build_result(ctx, checks, started, near_duplicate=distance)
+    result.detection_details.append(f"♻️ Near-duplicate of an image analyzed before ({distance}/64 hash bits differ)"
+                                    f" - pixel checks reused")
+    return result
+
+
+def analyze_metadata(source, filename=None):
+    """Metadata-only triage: run the HEADER_CHECKS without decoding a single pixel.
+
+    Answers in milliseconds, for queues that decide what deserves the full
+    analyze_image() pass. The result has metadata_only=True, so it never
+    counts as complete and never gets cached as a full verdict.
+    """
+    started = time.perf_counter()
+    with instrumentation.stage("forensics.header"):
+        image = load_image(source)
+        ctx = HeaderContext(image_metadata(image), filename)
+    checks = [_run_check(name, check, ctx) for name, check in CHECKS if name in HEADER_CHECKS]
+    instrumentation.export_metrics()
+
+    ai_indicators = sum(c.points for c in checks)
+    authenticity_score, suspicion_score, verdict, verdict_color, notes = score_verdict(ai_indicators)
+    notes.append("ℹ️ Metadata-only triage - pixel forensics not run yet")
+    return ForensicsResult(
+        width=ctx.width,
+        height=ctx.height,
+        ai_indicators=ai_indicators,
+        authenticity_score=authenticity_score,
+        suspicion_score=suspicion_score,
+        verdict=verdict,
+        verdict_color=verdict_color,
+        detection_details=[detail for c in checks for detail in c.details] + notes,
+        checks=checks,
+        seconds=time.perf_counter() - started,
+        metadata_only=True,
+    )
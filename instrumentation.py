@@ -0,0 +1,195 @@
+"""
+TrustBuddy AI - Per-stage performance instrumentation
+
+Wrap an analysis stage in `with stage(name, input_size):` to record its
+wall time, CPU time and (optionally) peak allocation. Records are kept
+on the stage object for the UI's performance panel, aggregated into
+process-wide Prometheus-style counters, and optionally logged as one
+JSON line each. When instrumentation is off, stage() hands back a shared
+no-op object, so the cost is a single attribute check.
+"""
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import types
+
+import config
+
+logger = logging.getLogger('trustbuddy.perf')
+
+# Minimum seconds between rewrites of the exported metrics file
+METRICS_WRITE_INTERVAL = 1.0
+
+
+settings = types.SimpleNamespace(
+    enabled=config.get_bool('instrumentation'),
+    trace_memory=config.get_bool('instrumentation_memory'),
+    log_json=config.get_bool('perf_log'),
+    metrics_file=config.get_setting('metrics_file'),
+)
+_totals = {}  # stage name -> {'calls', 'wall_seconds', 'cpu_seconds', 'peak_bytes'}
+_totals_lock = threading.Lock()
+_last_metrics_write = 0.0
+_memory_lock = threading.Lock()
+_open_stages = 0  # stages being measured while tracing
+_owns_tracing = False  # tracemalloc was started here, not by a caller such as bench.py
+
+
+def configure(enabled=None, trace_memory=None, log_json=None, metrics_file=None):
+    """Override the TRUSTBUDDY_* settings at runtime (benchmarks, workers)"""
+    if enabled is not None:
+        settings.enabled = enabled
+    if trace_memory is not None:
+        settings.trace_memory = trace_memory
+    if log_json is not None:
+        settings.log_json = log_json
+    if metrics_file is not None:
+        settings.metrics_file = metrics_file
+    _setup()
+
+
+def _setup():
+    global _owns_tracing
+    if settings.enabled and settings.trace_memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        _owns_tracing = True
+    if settings.log_json and not logger.handlers:
+        handler = logging.StreamHandler(sys.stderr)
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+
+
+class _NullStage:
+    """Stand-in returned while instrumentation is disabled"""
+    record = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+NULL_STAGE = _NullStage()
+
+
+class Stage:
+    """Context manager measuring one stage; `record` is filled in on exit.
+
+    CPU time is the calling thread's, so stages running on pool threads are
+    measured independently. Peak allocation uses tracemalloc, whose peak is
+    process-wide, so it is only reset when no other stage is open and only
+    if this module started tracing; a caller's own peak (bench.py) is never
+    disturbed. peak_bytes is the traced peak above the memory in use when
+    the stage began if that peak was reached during the stage, and the
+    stage's net growth otherwise (it stayed under an earlier high-water
+    mark). It is exact for a stage running alone after a reset, and
+    approximate when stages nest or overlap.
+    """
+
+    def __init__(self, name, input_size=None):
+        self.name = name
+        self.input_size = input_size
+        self.record = None
+
+    def __enter__(self):
+        global _open_stages
+        self._memory = tracemalloc.is_tracing()
+        if self._memory:
+            with _memory_lock:
+                if _owns_tracing and not _open_stages:
+                    tracemalloc.reset_peak()
+                _open_stages += 1
+                self._base, self._peak = tracemalloc.get_traced_memory()
+        self._cpu = time.thread_time()
+        self._wall = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        global _open_stages
+        wall = time.perf_counter() - self._wall
+        cpu = time.thread_time() - self._cpu
+        peak = None
+        if self._memory:
+            with _memory_lock:
+                _open_stages -= 1
+                current, process_peak = tracemalloc.get_traced_memory()
+            peak = max((process_peak if process_peak > self._peak else current) - self._base, 0)
+        self.record = {
+            'stage': self.name,
+            'wall_seconds': wall,
+            'cpu_seconds': cpu,
+            'peak_bytes': peak,
+            'input_size': self.input_size,
+            'error': exc_type.__name__ if exc_type else None,
+        }
+        _observe(self.record)
+        return False
+
+
+def stage(name, input_size=None):
+    if not settings.enabled:
+        return NULL_STAGE
+    return Stage(name, input_size)
+
+
+def _observe(record):
+    with _totals_lock:
+        totals = _totals.setdefault(record['stage'], {'calls': 0, 'wall_seconds': 0.0, 'cpu_seconds': 0.0,
+                                                      'peak_bytes': 0})
+        totals['calls'] += 1
+        totals['wall_seconds'] += record['wall_seconds']
+        totals['cpu_seconds'] += record['cpu_seconds']
+        totals['peak_bytes'] = max(totals['peak_bytes'], record['peak_bytes'] or 0)
+    if settings.log_json:
+        logger.info(json.dumps(dict(record, ts=time.time())))
+
+
+def snapshot():
+    """Copy of the process-wide per-stage totals"""
+    with _totals_lock:
+        return {name: dict(totals) for name, totals in _totals.items()}
+
+
+def render_prometheus():
+    """Per-stage totals in the Prometheus text exposition format"""
+    metrics = [
+        ('trustbuddy_stage_calls_total', 'counter', 'Completed runs of each analysis stage', 'calls'),
+        ('trustbuddy_stage_seconds_total', 'counter', 'Wall-clock seconds spent in each analysis stage', 'wall_seconds'),
+        ('trustbuddy_stage_cpu_seconds_total', 'counter', 'CPU seconds spent in each analysis stage', 'cpu_seconds'),
+        ('trustbuddy_stage_peak_bytes', 'gauge', 'Largest traced allocation peak seen in each stage', 'peak_bytes'),
+    ]
+    totals = snapshot()
+    lines = []
+    for metric, kind, help_text, field in metrics:
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} {kind}")
+        for name in sorted(totals):
+            lines.append(f'{metric}{{stage="{name}"}} {totals[name][field]}')
+    return '\n'.join(lines) + '\n'
+
+
+def export_metrics(force=False):
+    """Rewrite the metrics file (if configured), at most once per METRICS_WRITE_INTERVAL"""
+    global _last_metrics_write
+    path = settings.metrics_file
+    if not path or not settings.enabled:
+        return
+    now = time.monotonic()
+    if not force and now - _last_metrics_write < METRICS_WRITE_INTERVAL:
+        return
+    _last_metrics_write = now
+    handle, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix='.tmp')
+    with os.fdopen(handle, 'w', encoding='utf-8') as tmp:
+        tmp.write(render_prometheus())
+    os.replace(tmp_path, path)
+
+
+_setup()
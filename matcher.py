@@ -0,0 +1,63 @@
+"""
+TrustBuddy AI - Single-pass multi-term matcher
+
+Compiles any number of literal terms into one trie-shaped regular
+expression, so a text is scanned once regardless of how many rules exist:
+at each position the regex walks the shared-prefix trie instead of trying
+every term in turn.
+"""
+import re
+
+
+def _trie_pattern(node):
+    """Regex for a trie node; the end-of-term marker '' makes the continuation optional"""
+    ends_here = '' in node
+    branches = [re.escape(char) + _trie_pattern(child) for char, child in sorted(node.items()) if char != '']
+    if not branches:
+        return ''
+    if len(branches) == 1 and not ends_here:
+        return branches[0]
+    body = '(?:' + '|'.join(branches) + ')'
+    return body + '?' if ends_here else body
+
+
+class TermMatcher:
+    """Find every occurrence of every term, including overlapping ones.
+
+    Matching is plain substring matching, the same as `term in text`;
+    callers lower-case text and terms themselves.
+    """
+
+    def __init__(self, terms):
+        self.terms = sorted(set(term for term in terms if term))
+        trie = {}
+        for term in self.terms:
+            node = trie
+            for char in term:
+                node = node.setdefault(char, {})
+            node[''] = {}
+
+        # Greedy trie branches give the longest term at each start position; the
+        # zero-width lookahead lets matches overlap, and _prefixes recovers the
+        # shorter terms that start at the same position.
+        self._regex = re.compile('(?=(' + _trie_pattern(trie) + '))') if self.terms else None
+        term_set = set(self.terms)
+        self._prefixes = {
+            term: [term[:size] for size in range(len(term), 0, -1) if term[:size] in term_set]
+            for term in self.terms
+        }
+
+    def find_all(self, text):
+        """List of (term, start, end) for every occurrence, ordered by start offset"""
+        if self._regex is None:
+            return []
+        found = []
+        for match in self._regex.finditer(text):
+            start = match.start()
+            for term in self._prefixes[match.group(1)]:
+                found.append((term, start, start + len(term)))
+        return found
+
+    def found_terms(self, text):
+        """Set of distinct terms present in text"""
+        return {term for term, _, _ in self.find_all(text)}
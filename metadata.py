@@ -0,0 +1,247 @@
+"""
+TrustBuddy AI - Image metadata and provenance extractor
+
+Reads EXIF, XMP, C2PA content credentials and generator text chunks
+straight from a file's header segments: JPEG APPn markers, PNG chunks and
+WebP RIFF chunks. Pixel data is seeked over, never decoded, so an upload
+can be triaged in milliseconds before the pixel forensics run.
+"""
+import struct
+import zlib
+from dataclasses import dataclass, field
+from io import BytesIO
+
+from PIL import Image, PngImagePlugin
+from PIL.ExifTags import TAGS
+
+CAMERA_TAGS = ['Make', 'Model', 'DateTime', 'ExposureTime', 'FNumber']
+# Resolved once at import: EXIF tag id -> name, for the camera tags and the Exif sub-IFD
+CAMERA_TAG_IDS = {tag_id: name for tag_id, name in TAGS.items() if name in CAMERA_TAGS}
+SOFTWARE_TAG_ID = next(tag_id for tag_id, name in TAGS.items() if name == 'Software')
+EXIF_IFD_ID = next(tag_id for tag_id, name in TAGS.items() if name == 'ExifOffset')
+
+# What PIL raises on a corrupt or truncated EXIF block
+EXIF_ERRORS = (SyntaxError, struct.error, ValueError, OSError, EOFError)
+
+# Generator names found in Software / CreatorTool fields and PNG text chunks
+GENERATOR_SIGNATURES = ['midjourney', 'dall-e', 'dall·e', 'stable diffusion', 'stablediffusion', 'firefly',
+                        'imagen', 'novelai', 'comfyui', 'automatic1111', 'leonardo.ai', 'openai']
+# Keywords Stable Diffusion front-ends use for their PNG text chunks
+GENERATOR_TEXT_KEYS = {'parameters', 'prompt', 'workflow', 'sd-metadata', 'dream'}
+# IPTC digital source types declaring generated media (trainedAlgorithmicMedia and friends)
+IPTC_AI_SOURCE = b'algorithmicmedia'
+
+XMP_JPEG_PREFIX = b'http://ns.adobe.com/xap/1.0/\x00'
+XMP_PNG_KEY = b'XML:com.adobe.xmp'
+# Text and metadata chunks larger than this are skipped rather than read
+MAX_SEGMENT_BYTES = 4 * 1024 * 1024
+# Compressed PNG text is inflated to at most PIL's own caps, per chunk and per file, so a
+# zlib bomb can't balloon (chunks after IDAT are read here but never by PIL's open())
+MAX_TEXT_CHUNK = PngImagePlugin.MAX_TEXT_CHUNK
+MAX_TEXT_MEMORY = PngImagePlugin.MAX_TEXT_MEMORY
+
+
+@dataclass
+class ImageMetadata:
+    """What the file header says about an image"""
+    format: str = None
+    width: int = 0
+    height: int = 0
+    exif: Image.Exif = None  # None when the EXIF block is present but unreadable
+    exif_error: str = None
+    xmp: bytes = b''
+    c2pa: bool = False
+    text: dict = field(default_factory=dict)  # PNG text chunks, keyword -> value
+
+    @property
+    def has_camera_info(self):
+        """Any of CAMERA_TAGS in the primary IFD (the tags the metadata check has always counted)"""
+        return self.exif is not None and not CAMERA_TAG_IDS.keys().isdisjoint(self.exif)
+
+    @property
+    def camera_info(self):
+        """Camera tag name -> value, from the primary IFD and the Exif sub-IFD"""
+        if self.exif is None:
+            return {}
+        info = {CAMERA_TAG_IDS[tag_id]: value for tag_id, value in self.exif.items() if tag_id in CAMERA_TAG_IDS}
+        try:
+            sub_ifd = self.exif.get_ifd(EXIF_IFD_ID)
+        except EXIF_ERRORS:
+            sub_ifd = {}
+        info.update((CAMERA_TAG_IDS[tag_id], value) for tag_id, value in sub_ifd.items() if tag_id in CAMERA_TAG_IDS)
+        return info
+
+    @property
+    def software(self):
+        return str(self.exif.get(SOFTWARE_TAG_ID, '')) if self.exif is not None else ''
+
+    @property
+    def ai_markers(self):
+        """Human-readable reasons the metadata itself declares generated content"""
+        markers = []
+        xmp = self.xmp.lower()
+        if IPTC_AI_SOURCE in xmp:
+            markers.append("IPTC digital source type declares AI-generated media")
+        if GENERATOR_TEXT_KEYS & {key.lower() for key in self.text}:
+            markers.append("PNG text chunks carry image-generator parameters")
+        fields = ' '.join([self.software, xmp.decode('utf-8', 'replace')] + list(self.text.values())).lower()
+        generators = sorted({name for name in GENERATOR_SIGNATURES if name in fields})
+        if generators:
+            markers.append(f"Generator named in metadata: {', '.join(generators)}")
+        return markers
+
+
+# ==============================
+# Container walkers
+# ==============================
+def _read_jpeg(stream, meta):
+    stream.read(2)  # SOI
+    while True:
+        byte = stream.read(1)
+        while byte and byte != b'\xff':
+            byte = stream.read(1)  # skip to the next marker
+        marker = stream.read(1)
+        while marker == b'\xff':
+            marker = stream.read(1)  # fill bytes
+        if not marker or marker in (b'\xda', b'\xd9'):
+            return  # start of scan (pixel data) or end of image
+        if marker[0] in range(0xd0, 0xd8) or marker == b'\x01':
+            continue  # markers without a length
+        header = stream.read(2)
+        if len(header) < 2:
+            return
+        length = struct.unpack('>H', header)[0] - 2
+        if marker in (b'\xe1', b'\xeb') and length <= MAX_SEGMENT_BYTES:
+            data = stream.read(length)
+            if marker == b'\xe1' and data.startswith(b'Exif\x00\x00'):
+                _load_exif(meta, data)
+            elif marker == b'\xe1' and data.startswith(XMP_JPEG_PREFIX):
+                meta.xmp += data[len(XMP_JPEG_PREFIX):]
+            elif marker == b'\xeb' and b'jumb' in data[:64] and b'c2pa' in data[:256]:
+                meta.c2pa = True  # APP11 JUMBF box holding a C2PA manifest store
+        else:
+            stream.seek(length, 1)
+
+
+def _read_png(stream, meta):
+    stream.read(8)  # signature
+    text_budget = MAX_TEXT_MEMORY
+    while True:
+        header = stream.read(8)
+        if len(header) < 8:
+            return
+        length, kind = struct.unpack('>I4s', header)
+        if kind == b'IEND':
+            return
+        if kind in (b'eXIf', b'tEXt', b'zTXt', b'iTXt', b'caBX') and length <= MAX_SEGMENT_BYTES and text_budget > 0:
+            data = stream.read(length)
+            if kind == b'eXIf':
+                _load_exif(meta, data)
+            elif kind == b'caBX':
+                meta.c2pa = True
+            else:
+                text_budget -= _png_text(meta, kind, data, min(MAX_TEXT_CHUNK, text_budget))
+            stream.seek(4, 1)  # CRC
+        else:
+            stream.seek(length + 4, 1)  # IDAT and everything else, plus CRC
+
+
+def _inflate(data, max_length):
+    """zlib-decompress at most max_length bytes; longer text is truncated there"""
+    return zlib.decompressobj().decompress(data, max_length)
+
+
+def _png_text(meta, kind, data, max_length):
+    """Store one text chunk (value cut to max_length bytes); returns the bytes stored"""
+    key, _, value = data.partition(b'\x00')
+    try:
+        if kind == b'zTXt':
+            value = _inflate(value[1:], max_length)
+        elif kind == b'iTXt':
+            compressed, value = value[0], value[2:]
+            value = value.split(b'\x00', 2)[-1]  # skip language tag and translated keyword
+            if compressed:
+                value = _inflate(value, max_length)
+    except (zlib.error, IndexError):
+        return 0
+    value = value[:max_length]
+    if key == XMP_PNG_KEY:
+        meta.xmp += value
+    else:
+        meta.text[key.decode('latin-1')] = value.decode('utf-8', 'replace')
+    return len(value)
+
+
+def _read_webp(stream, meta):
+    stream.read(12)  # RIFF size WEBP
+    while True:
+        header = stream.read(8)
+        if len(header) < 8:
+            return
+        kind, length = struct.unpack('<4sI', header)
+        padded = length + (length & 1)
+        if kind in (b'EXIF', b'XMP ') and length <= MAX_SEGMENT_BYTES:
+            data = stream.read(length)
+            if kind == b'EXIF':
+                _load_exif(meta, data)
+            else:
+                meta.xmp += data
+            stream.seek(padded - length, 1)
+        else:
+            stream.seek(padded, 1)
+
+
+def _load_exif(meta, data):
+    exif = Image.Exif()
+    try:
+        exif.load(data)
+        len(exif)  # parsing is lazy; make a corrupt IFD fail here, not in a check
+    except EXIF_ERRORS as error:
+        meta.exif, meta.exif_error = None, f"{type(error).__name__}: {error}"
+        return
+    meta.exif, meta.exif_error = exif, None
+
+
+WALKERS = {'JPEG': _read_jpeg, 'PNG': _read_png, 'WEBP': _read_webp}
+
+
+# ==============================
+# Entry points
+# ==============================
+def read_metadata(source, image=None):
+    """ImageMetadata from raw bytes or a seekable file object, without decoding pixels.
+
+    Format and dimensions come from PIL's lazy header parse (pass `image`
+    if the stream is already open in PIL); EXIF, XMP and C2PA markers from
+    the container walkers above, reading the stream from its start.
+    Formats without a walker fall back to what PIL exposes in Image.info.
+    """
+    stream = BytesIO(source) if isinstance(source, (bytes, bytearray, memoryview)) else source
+    if image is None:
+        image = Image.open(stream)
+    walker = WALKERS.get(image.format)
+    if walker is None:
+        return from_image(image)
+    meta = ImageMetadata(image.format, image.width, image.height, exif=Image.Exif())
+    position = stream.tell()
+    stream.seek(0)
+    walker(stream, meta)
+    stream.seek(position)
+    return meta
+
+
+def from_image(image):
+    """ImageMetadata for an already-opened PIL image (e.g. one passed in by a caller)"""
+    meta = ImageMetadata(image.format, image.width, image.height)
+    try:
+        meta.exif = image.getexif()
+        len(meta.exif)
+    except EXIF_ERRORS as error:
+        meta.exif, meta.exif_error = None, f"{type(error).__name__}: {error}"
+    xmp = image.info.get('xmp') or image.info.get(XMP_PNG_KEY.decode()) or b''
+    meta.xmp = xmp.encode('utf-8') if isinstance(xmp, str) else bytes(xmp)
+    meta.text = {key: value for key, value in image.info.items()
+                 if isinstance(value, str) and key not in ('xmp', XMP_PNG_KEY.decode())}
+    meta.c2pa = 'caBX' in image.info or any(segment[0] == 'APP11' and b'c2pa' in segment[1][:256]
+                                             for segment in getattr(image, 'applist', []))
+    return meta
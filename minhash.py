@@ -0,0 +1,176 @@
+"""
+TrustBuddy AI - Near-duplicate text index
+
+Finds earlier texts that are lightly edited copies of a new one, so a
+viral post keeps its verdict even when a repost rewords the phrase a rule
+keys on. Texts are cut into character shingles and summarized by a
+64-value MinHash signature. An LSH banding index (16 bands of 4) proposes
+candidates, and the candidates are confirmed by their estimated Jaccard
+similarity. Each stored text costs about 500 bytes: its 256-byte
+signature, 64 bytes of band keys and 16 int32 bucket-table cells.
+"""
+import re
+import threading
+import zlib
+
+import numpy as np
+
+import config
+
+SHINGLE_CHARS = 5  # over the words re-joined by single spaces; survives one-word edits better than word shingles
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+
+# Fixed, not scoring_seed: signatures must agree between every process and every release
+_rng = np.random.default_rng(0x7B5)
+# Multiply-add-shift hash family: h(x) = (a * x + b) >> 32 over 64-bit words, with a odd
+PERM_A = _rng.integers(1, 2**63, NUM_PERM, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+PERM_B = _rng.integers(0, 2**63, NUM_PERM, dtype=np.uint64)
+BAND_MIX = _rng.integers(1, 2**63, ROWS, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+
+WORD_PATTERN = re.compile(r'\w+')
+
+
+def shingles(text):
+    """Set of SHINGLE_CHARS-character shingles of a text, ignoring case, punctuation and spacing"""
+    words = ' '.join(WORD_PATTERN.findall(text.lower()))
+    if len(words) <= SHINGLE_CHARS:
+        return {words} if words else set()
+    return {words[start:start + SHINGLE_CHARS] for start in range(len(words) - SHINGLE_CHARS + 1)}
+
+
+def signature(text):
+    """uint32 MinHash signature of a text's shingles, or None when it has no words"""
+    parts = shingles(text)
+    if not parts:
+        return None
+    hashes = np.fromiter((zlib.crc32(part.encode('utf-8')) for part in parts), dtype=np.uint64, count=len(parts))
+    permuted = (hashes[:, None] * PERM_A + PERM_B) >> np.uint64(32)
+    return permuted.min(axis=0).astype(np.uint32)
+
+
+def band_keys(text_signature):
+    """One uint32 bucket key per band of a signature"""
+    bands = text_signature.reshape(BANDS, ROWS).astype(np.uint64)
+    return ((bands * BAND_MIX).sum(axis=1) >> np.uint64(32)).astype(np.uint32)
+
+
+EMPTY = -1  # free bucket-table cell
+_BAND_ROWS = np.arange(BANDS)
+
+
+class NearDuplicateTexts:
+    """Bounded MinHash/LSH index of earlier texts and their outcomes.
+
+    Up to `capacity` signatures live in a ring, oldest dropped first. Each
+    band has an open-addressing (linear probing) table of int32 ring slots,
+    at least twice the capacity so probe runs stay short; a cell holds the
+    latest text in its bucket, and the bucket key is read back from that
+    slot's band keys, so the tables store nothing else. A lookup costs
+    BANDS short probes whatever the size. lookup() returns the outcome of
+    the most similar stored text whose estimated Jaccard similarity is at
+    least `threshold`. Outcomes are interned, so the texts that share a
+    verdict store it once. The index empties itself when the `version` it
+    is used with changes, e.g. on a knowledge base reload.
+    """
+
+    def __init__(self, capacity=50_000, threshold=0.7):
+        self.capacity = capacity
+        self.threshold = threshold
+        self.signatures = np.zeros((capacity, NUM_PERM), dtype=np.uint32)
+        self.band_keys = np.zeros((capacity, BANDS), dtype=np.uint32)
+        self._mask = (1 << (2 * capacity - 1).bit_length()) - 1
+        self.buckets = np.full((BANDS, self._mask + 1), EMPTY, dtype=np.int32)
+        self.outcome_ids = np.zeros(capacity, dtype=np.uint32)
+        self.outcomes = []
+        self._outcome_ids = {}  # interning key -> position in outcomes
+        self.version = None
+        self._count = 0
+        self._next = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls):
+        return cls(capacity=config.get_int('near_duplicate_text_max_entries'),
+                   threshold=config.get_float('near_duplicate_text_threshold'))
+
+    def __len__(self):
+        return self._count
+
+    def use_version(self, version):
+        """Forget everything stored under a different version"""
+        with self._lock:
+            if version != self.version:
+                self.version = version
+                self.outcomes, self._outcome_ids = [], {}
+                self.buckets.fill(EMPTY)
+                self._count = self._next = 0
+
+    # ------------------------------
+    # Bucket tables
+    # ------------------------------
+    def _probe(self, keys):
+        """Cell of each band's table holding its bucket key, or the free cell where it belongs"""
+        keys = np.asarray(keys, dtype=np.uint32)
+        cells = (keys & self._mask).astype(np.intp)
+        slots = self.buckets[_BAND_ROWS, cells]
+        # An EMPTY slot indexes the last row here; the first test masks it out
+        clashes = (slots != EMPTY) & (self.band_keys[slots, _BAND_ROWS] != keys)
+        for band in np.flatnonzero(clashes).tolist():  # walk the few runs that hold other keys
+            table, stored, key = self.buckets[band], self.band_keys[:, band], int(keys[band])
+            cell = int(cells[band])
+            while table[cell] != EMPTY and stored[table[cell]] != key:
+                cell = (cell + 1) & self._mask
+            cells[band] = cell
+        return cells
+
+    def _unlink(self, band, cell):
+        """Free a cell, shifting later cells of the probe run back so none is orphaned"""
+        table, keys, mask = self.buckets[band], self.band_keys[:, band], self._mask
+        table[cell] = EMPTY
+        probe = (cell + 1) & mask
+        while table[probe] != EMPTY:
+            home = int(keys[table[probe]]) & mask
+            # The entry may fill the hole unless its home lies between the hole and itself
+            if (probe - home) & mask >= (probe - cell) & mask:
+                table[cell] = table[probe]
+                table[probe] = EMPTY
+                cell = probe
+            probe = (probe + 1) & mask
+
+    def lookup(self, text_signature):
+        """(similarity, outcome) of the closest stored text at or above the threshold, or None"""
+        keys = band_keys(text_signature)
+        with self._lock:
+            slots = self.buckets[_BAND_ROWS, self._probe(keys)]
+            candidates = np.unique(slots[slots != EMPTY]).astype(np.intp)
+            if not len(candidates):
+                return None
+            similarities = (self.signatures[candidates] == text_signature).mean(axis=1)
+            best = int(np.argmax(similarities))
+            similarity = float(similarities[best])
+            if similarity < self.threshold:
+                return None
+            return similarity, self.outcomes[self.outcome_ids[candidates[best]]]
+
+    def add(self, text_signature, outcome, key):
+        """Store a signature; `key` identifies equal outcomes so each is kept once"""
+        with self._lock:
+            outcome_id = self._outcome_ids.get(key)
+            if outcome_id is None:
+                outcome_id = self._outcome_ids[key] = len(self.outcomes)
+                self.outcomes.append(outcome)
+            slot = self._next
+            if self._count == self.capacity:
+                # Unlink the text being overwritten from the buckets that still point at it
+                cells = self._probe(self.band_keys[slot])
+                for band in np.flatnonzero(self.buckets[_BAND_ROWS, cells] == slot).tolist():
+                    self._unlink(band, int(cells[band]))
+            keys = band_keys(text_signature)
+            self.signatures[slot] = text_signature
+            self.band_keys[slot] = keys
+            self.buckets[_BAND_ROWS, self._probe(keys)] = slot
+            self.outcome_ids[slot] = outcome_id
+            self._next = (self._next + 1) % self.capacity
+            self._count = min(self._count + 1, self.capacity)
@@ -0,0 +1,27 @@
+"""
+TrustBuddy AI - Deterministic scoring
+
+Where a score has no rule behind it, it is drawn from a random generator
+seeded by the input itself rather than from global np.random state. Equal
+inputs then get equal scores in every process and on every node, so
+results can be cached, load-balanced and benchmarked. The scoring_seed
+setting changes every such draw at once.
+"""
+import hashlib
+
+import numpy as np
+
+import config
+
+
+def seed():
+    return config.get_int('scoring_seed')
+
+
+def input_rng(*parts):
+    """np.random.Generator seeded from the given input parts and the scoring_seed setting"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr(seed()).encode())
+    for part in parts:
+        digest.update(b'\0' + (part if isinstance(part, bytes) else str(part).encode('utf-8')))
+    return np.random.default_rng(int.from_bytes(digest.digest(), 'little'))
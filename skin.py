@@ -0,0 +1,123 @@
+"""
+TrustBuddy AI - Skin segmentation
+
+Classifies pixels as skin with a lookup table instead of per-pixel
+arithmetic. Each model's rule is evaluated once per process over every
+24-bit color and folded into a 64x64x64 table of quantized RGB cells, so
+a strip is classified with one gather over its packed pixels whatever the
+rule costs. The few cells a rule boundary cuts through are marked
+ambiguous, and only their pixels are checked against the rule itself, so
+the table is exact.
+
+The skin check needs the gray mean and variance of the skin pixels. Those
+come from a histogram of r+g+b over the skin pixels, accumulated in the
+same pass, so no masked copy of the image is ever made.
+"""
+import threading
+
+import numpy as np
+
+BITS = 6  # per channel: 2**18 cells, a 512 KB table that stays in cache
+SHIFT = 8 - BITS
+
+# Table values, added to a pixel's r+g+b so one bincount separates the classes
+SKIN, NOT_SKIN, AMBIGUOUS = 0, 1024, 2048
+CHANNEL_SUMS = 766  # r+g+b of a uint8 pixel is 0..765
+
+
+# ==============================
+# Skin rules (vectorized over int arrays of r, g, b)
+# ==============================
+def rgb_rule(red, green, blue):
+    """Uniform-daylight RGB rule (Peer et al.); the rule this check has always used"""
+    return (red > 95) & (green > 40) & (blue > 20) & (red > blue) & (red > green)
+
+
+def ycbcr_rule(red, green, blue):
+    """Chai & Ngan chroma box in full-range BT.601 YCbCr; insensitive to brightness"""
+    cb = 128 - 0.168736 * red - 0.331264 * green + 0.5 * blue
+    cr = 128 + 0.5 * red - 0.418688 * green - 0.081312 * blue
+    return (cb >= 77) & (cb <= 127) & (cr >= 133) & (cr <= 173)
+
+
+def hsv_rule(red, green, blue):
+    """Hue 0-50 degrees with moderate saturation (Sobottka & Pitas), excluding very dark pixels"""
+    high = np.maximum(np.maximum(red, green), blue).astype(np.float32)
+    low = np.minimum(np.minimum(red, green), blue).astype(np.float32)
+    spread = high - low
+    saturation = np.divide(spread, high, out=np.zeros_like(spread), where=high > 0)
+    # Hue of the red sector, the only one the range below can fall in
+    hue = np.divide(60.0 * (green - blue), spread, out=np.full_like(spread, -1.0), where=spread > 0)
+    return ((red == high) & (hue >= 0) & (hue <= 50) & (saturation >= 0.23) & (saturation <= 0.68)
+            & (high > 0.35 * 255))
+
+
+RULES = {'rgb': rgb_rule, 'ycbcr': ycbcr_rule, 'hsv': hsv_rule}
+
+
+# ==============================
+# Lookup table
+# ==============================
+def build_table(rule):
+    """uint16 SKIN / NOT_SKIN / AMBIGUOUS per quantized RGB cell, from the rule over all 2**24 colors"""
+    cells = 1 << BITS
+    channel = np.arange(256, dtype=np.int32)
+    green, blue = np.meshgrid(channel, channel, indexing='ij')
+    any_skin = np.zeros((cells, cells, cells), dtype=bool)
+    all_skin = np.ones((cells, cells, cells), dtype=bool)
+    for red in range(256):
+        plane = rule(np.int32(red), green, blue).reshape(cells, 1 << SHIFT, cells, 1 << SHIFT)
+        any_skin[red >> SHIFT] |= plane.any(axis=(1, 3))
+        all_skin[red >> SHIFT] &= plane.all(axis=(1, 3))
+    table = np.full((cells, cells, cells), AMBIGUOUS, dtype=np.uint16)
+    table[all_skin] = SKIN
+    table[~any_skin] = NOT_SKIN
+    return table.ravel()
+
+
+class SkinModel:
+    """A skin rule compiled to a lookup table"""
+
+    def __init__(self, rule):
+        self.rule = rule
+        self.table = build_table(rule)
+
+    def histogram(self, strip):
+        """Counts of r+g+b (0..765) over the skin pixels of an (h, w, 3) uint8 strip"""
+        red, green, blue = strip[:, :, 0], strip[:, :, 1], strip[:, :, 2]
+        cells = strip >> SHIFT  # one contiguous pass, then three strided ones
+        packed = cells[:, :, 0].astype(np.int32)
+        packed <<= BITS
+        packed |= cells[:, :, 1]
+        packed <<= BITS
+        packed |= cells[:, :, 2]
+
+        keys = self.table.take(packed)
+        keys += red
+        keys += green
+        keys += blue
+        counts = np.bincount(keys.ravel(), minlength=AMBIGUOUS + CHANNEL_SUMS)
+        histogram = counts[:CHANNEL_SUMS].copy()
+
+        if counts[AMBIGUOUS:].any():
+            # Pixels in cells the rule boundary crosses: classify them one by one
+            positions = np.flatnonzero(keys.ravel() >= AMBIGUOUS)
+            pixels = strip.reshape(-1, 3)[positions].astype(np.int32)
+            red, green, blue = pixels[:, 0], pixels[:, 1], pixels[:, 2]
+            skin = self.rule(red, green, blue)
+            histogram += np.bincount((red + green + blue)[skin], minlength=CHANNEL_SUMS)
+        return histogram
+
+
+_models = {}
+_models_lock = threading.Lock()
+
+
+def model(name):
+    """The process-wide SkinModel for a rule name, built on first use"""
+    with _models_lock:
+        if name not in _models:
+            if name not in RULES:
+                raise ValueError(f"unknown skin model {name!r}; expected one of {sorted(RULES)}")
+            _models[name] = SkinModel(RULES[name])
+        return _models[name]
@@ -0,0 +1,45 @@
+"""
+TrustBuddy AI - Bulk text reader tests
+"""
+import io
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bulk_text  # noqa: E402
+
+
+def upload(data):
+    return bulk_text.open_upload(io.BytesIO(data))
+
+
+def errors(records):
+    return [(record_id, text.error if isinstance(text, bulk_text.InvalidRecord) else text)
+            for record_id, text in records]
+
+
+def test_non_utf8_csv_row_becomes_an_error_and_the_run_continues():
+    data = 'id,text\n1,first post\n2,caf\xe9 au lait\n3,third post\n'.encode('cp1252')
+    assert errors(bulk_text.read_records(upload(data), 'csv')) == [
+        ('1', 'first post'), (2, "row is not UTF-8 text"), ('3', 'third post')]
+
+
+def test_malformed_jsonl_lines_become_errors():
+    data = b'{"id": 1, "text": "ok"}\n{bad json\n[1, 2]\n{"text": "caf\xe9"}\n{"id": 5, "text": "last"}\n'
+    rows = errors(bulk_text.read_records(upload(data), 'jsonl'))
+    assert [row[0] for row in rows] == [1, 2, 3, 4, 5]
+    assert rows[1][1].startswith("invalid JSON")
+    assert rows[2][1] == "expected a JSON object, got list"
+    assert rows[3][1] == "line is not UTF-8 text"
+    assert rows[4] == (5, 'last')
+
+
+def test_falsy_ids_are_kept():
+    data = b'{"id": 0, "text": "zero"}\n{"id": "", "text": "empty"}\n{"text": "none"}\n'
+    assert [record_id for record_id, _ in bulk_text.read_records(upload(data), 'jsonl')] == [0, '', 3]
+
+
+def test_strictly_decoded_stream_stops_with_an_error_row():
+    stream = io.TextIOWrapper(io.BytesIO(b'id,text\n1,caf\xe9\n'), encoding='utf-8', newline='')
+    assert errors(bulk_text.read_records(stream, 'csv')) == [(1, "input is not UTF-8 text")]
@@ -0,0 +1,146 @@
+"""
+TrustBuddy AI - Bulk URL scanner tests
+
+Runs URLScanner against stub HTTP servers on the loopback interface, so
+no network access is needed. The fast server is addressed as 'localhost'
+and the slow one as '127.0.0.1', which the scanner treats as two hosts.
+"""
+import asyncio
+import io
+import os
+import socket
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bulk_urls  # noqa: E402
+
+SLOW_SECONDS = 0.2
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.in_flight += 1
+            server.peak = max(server.peak, server.in_flight)
+        try:
+            if self.path.startswith('/slow'):
+                time.sleep(SLOW_SECONDS)
+            if self.path == '/redirect':
+                self._send(302, b'', [('Location', '/page')])
+            elif self.path == '/loop':
+                self._send(302, b'', [('Location', '/loop')])
+            elif self.path.startswith('/elsewhere'):
+                self._send(302, b'', [('Location', f"{server.redirect_to}/slow{self.path}")])
+            elif self.path == '/hang':
+                time.sleep(2)
+                self._send(200, b'late')
+            else:
+                self._send(200, b'<html><head><title>Stub &amp; page</title></head><body>ok</body></html>',
+                           [('Content-Type', 'text/html; charset=utf-8')])
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+    def _send(self, status, body, headers=()):
+        self.send_response(status)
+        for name, value in headers:
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    servers = []
+
+    def start(host):
+        server = ThreadingHTTPServer((host, 0), StubHandler)
+        server.daemon_threads = True
+        server.lock = threading.Lock()
+        server.in_flight = server.peak = 0
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def scan(urls, **options):
+    """(row, seconds since the scan started) for every URL, in completion order"""
+    async def collect(scanner):
+        started = time.perf_counter()
+        return [(row, time.perf_counter() - started) async for row in scanner.scan(urls)]
+
+    with bulk_urls.URLScanner(**options) as scanner:
+        return asyncio.run(collect(scanner))
+
+
+def test_crowded_host_does_not_starve_others(stub_server):
+    slow = stub_server('127.0.0.1')
+    fast = stub_server('127.0.0.1')
+    slow_urls = [f"http://127.0.0.1:{slow.server_port}/slow/{i}" for i in range(40)]
+    fast_urls = [f"http://localhost:{fast.server_port}/page/{i}" for i in range(20)]
+
+    results = scan(slow_urls + fast_urls, concurrency=8, per_host=2, timeout=5)
+
+    assert len(results) == 60
+    assert all(row['status'] == 200 for row, _ in results)
+    # The slow host alone needs 40 / 2 * SLOW_SECONDS = 4 s; fast URLs must not queue behind it
+    last_fast = max(seconds for row, seconds in results if 'localhost' in row['url'])
+    assert last_fast < 2 * SLOW_SECONDS
+    assert slow.peak <= 2
+    assert fast.peak <= 2
+
+
+def test_redirects_take_their_target_hosts_slots(stub_server):
+    target = stub_server('localhost')
+    origins = [stub_server(f"127.0.0.{last}") for last in range(2, 6)]
+    urls = []
+    for origin in origins:
+        origin.redirect_to = f"http://localhost:{target.server_port}"
+        urls += [f"http://{origin.server_address[0]}:{origin.server_port}/elsewhere/{i}" for i in range(4)]
+
+    results = scan(urls, concurrency=16, per_host=2, timeout=5)
+
+    assert [(row['status'], row['redirects']) for row, _ in results] == [(200, 1)] * 16
+    assert target.peak <= 2
+
+
+def test_rows_report_redirects_titles_and_errors(stub_server):
+    server = stub_server('127.0.0.1')
+    base = f"http://127.0.0.1:{server.server_port}"
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        closed_port = probe.getsockname()[1]
+
+    rows = {row['url']: row for row, _ in scan(
+        [f"{base}/redirect", f"{base}/loop", f"{base}/hang", f"http://127.0.0.1:{closed_port}/", "not a url"],
+        concurrency=4, per_host=4, timeout=0.5, max_redirects=3)}
+
+    redirected = rows[f"{base}/redirect"]
+    assert (redirected['status'], redirected['redirects'], redirected['title']) == (200, 1, "Stub & page")
+    assert redirected['final_url'] == f"{base}/page"
+    assert rows[f"{base}/loop"]['error'] == 'TooManyRedirects'
+    assert rows[f"{base}/hang"]['error'] == 'ReadTimeout'
+    assert rows[f"http://127.0.0.1:{closed_port}/"]['error'] == 'ConnectionError'
+    assert rows["not a url"]['error'] == 'InvalidURL'
+
+
+def test_undecodable_lines_become_error_rows():
+    stream = io.TextIOWrapper(io.BytesIO(b'http://caf\xe9.example/\n'), encoding='utf-8', errors='surrogateescape')
+    rows = [row for row, _ in scan(bulk_urls.read_urls(stream, 'txt'), concurrency=2, per_host=2, timeout=1)]
+    assert [row['error'] for row in rows] == ["line is not UTF-8 text"]
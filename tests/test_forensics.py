@@ -0,0 +1,86 @@
+"""
+TrustBuddy AI - Forensics engine tests
+"""
+import io
+import os
+import sys
+import time
+import types
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import forensics  # noqa: E402
+import phash  # noqa: E402
+
+
+def smooth_png(size=512):
+    """A smooth gradient image: the kind of upload several pixel checks flag"""
+    ramp = np.linspace(0, 255, size, dtype=np.float32)
+    pixels = np.dstack([np.add.outer(ramp, ramp) / 2, np.tile(ramp, (size, 1)), np.tile(ramp[:, None], (1, size))])
+    buffer = io.BytesIO()
+    Image.fromarray(pixels.astype(np.uint8)).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+def test_early_exit_results_are_not_reused_for_near_duplicates():
+    data = smooth_png()
+    index = phash.PerceptualIndex(capacity=16)
+
+    early = forensics.analyze_image(data, 'ai_generated.png', early_exit=True, near_duplicates=index)
+    assert early.skipped
+    assert len(index) == 0
+
+    full = forensics.analyze_image(data, 'IMG_0001.png')
+    copy = forensics.analyze_image(data, 'IMG_0001.png', near_duplicates=index)
+    assert copy.near_duplicate is None
+    assert (copy.ai_indicators, copy.verdict) == (full.ai_indicators, full.verdict)
+
+
+def test_near_duplicate_reuses_pixel_checks_and_reruns_header_checks():
+    data = smooth_png()
+    index = phash.PerceptualIndex(capacity=16)
+
+    forensics.analyze_image(data, 'IMG_0001.png', near_duplicates=index)
+    assert len(index) == 1
+    renamed = forensics.analyze_image(data, 'midjourney_render.png', near_duplicates=index)
+    alone = forensics.analyze_image(data, 'midjourney_render.png')
+
+    assert renamed.near_duplicate == 0
+    assert (renamed.ai_indicators, renamed.verdict) == (alone.ai_indicators, alone.verdict)
+
+
+def test_untiled_image_is_converted_to_gray_once(monkeypatch):
+    conversions = []
+    strip_gray = forensics.strip_gray
+    monkeypatch.setattr(forensics, 'strip_gray', lambda strip: conversions.append(strip.shape) or strip_gray(strip))
+
+    forensics.analyze_image(smooth_png(), 'IMG_0001.png')
+    assert conversions == [(512, 512, 3)]
+
+    conversions.clear()
+    forensics.analyze_image(smooth_png(), 'IMG_0001.png', tile_rows=128)
+    assert len(conversions) > 1
+
+
+def test_timeout_cancels_checks_that_have_not_started(monkeypatch):
+    started = []
+
+    def hang(ctx):
+        started.append('hang')
+        time.sleep(0.5)
+        return 10, []
+
+    def queued(ctx):
+        started.append('queued')
+        return 10, []
+
+    monkeypatch.setattr(forensics, 'CHECKS', [('hang', hang), ('queued', queued)])
+    ctx = types.SimpleNamespace(analysis_width=1, analysis_height=1)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        checks = forensics.run_checks(ctx, executor, check_timeout=0.1)
+    assert [(c.name, c.points, c.timed_out) for c in checks] == [('hang', 0, True), ('queued', 0, True)]
+    assert started == ['hang']
@@ -0,0 +1,42 @@
+"""
+TrustBuddy AI - Instrumentation tests
+"""
+import os
+import sys
+import tracemalloc
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import instrumentation  # noqa: E402
+
+MB = 2**20
+
+
+@pytest.fixture
+def tracing():
+    tracemalloc.start()
+    yield
+    tracemalloc.stop()
+
+
+def test_stage_keeps_the_callers_peak(tracing):
+    block = bytearray(8 * MB)
+    del block
+    with instrumentation.Stage("test.small") as measured:
+        small = bytearray(MB)
+    del small
+    assert tracemalloc.get_traced_memory()[1] >= 8 * MB
+    assert MB <= measured.record['peak_bytes'] < 2 * MB
+
+
+def test_nested_stage_does_not_reset_the_outer_peak(tracing, monkeypatch):
+    monkeypatch.setattr(instrumentation, '_owns_tracing', True)
+    with instrumentation.Stage("test.outer") as outer:
+        block = bytearray(8 * MB)
+        del block
+        with instrumentation.Stage("test.inner") as inner:
+            pass
+    assert outer.record['peak_bytes'] >= 8 * MB
+    assert inner.record['peak_bytes'] < MB
@@ -0,0 +1,58 @@
+"""
+TrustBuddy AI - Metadata extractor tests
+"""
+import io
+import os
+import struct
+import sys
+import tracemalloc
+import zlib
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import metadata  # noqa: E402
+
+
+def png_chunk(kind, data):
+    return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+
+def png_with_trailing_chunks(*chunks):
+    """A small PNG with extra chunks inserted after its IDAT, just before IEND"""
+    buffer = io.BytesIO()
+    Image.fromarray(np.zeros((16, 16, 3), dtype=np.uint8)).save(buffer, 'PNG')
+    data = buffer.getvalue()
+    iend = data.rindex(b'IEND') - 4
+    return data[:iend] + b''.join(chunks) + data[iend:]
+
+
+def test_ztxt_bomb_after_idat_is_truncated():
+    bomb = zlib.compress(b'A' * (256 * 1024 * 1024), 9)  # 256 MB of text in ~250 KB
+    data = png_with_trailing_chunks(png_chunk(b'zTXt', b'parameters\x00\x00' + bomb))
+
+    tracemalloc.start()
+    meta = metadata.read_metadata(data)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    assert len(meta.text['parameters']) == metadata.MAX_TEXT_CHUNK
+    assert peak < 16 * 1024 * 1024
+
+
+def test_compressed_text_total_is_capped():
+    bomb = zlib.compress(b'B' * (4 * 1024 * 1024), 9)
+    chunks = [png_chunk(b'iTXt', b'key%d\x00\x01\x00\x00\x00' % number + bomb) for number in range(100)]
+    meta = metadata.read_metadata(png_with_trailing_chunks(*chunks))
+
+    assert sum(len(value) for value in meta.text.values()) <= metadata.MAX_TEXT_MEMORY
+    assert all(len(value) <= metadata.MAX_TEXT_CHUNK for value in meta.text.values())
+
+
+def test_small_text_chunks_are_read():
+    data = png_with_trailing_chunks(png_chunk(b'tEXt', b'Software\x00ComfyUI'),
+                                    png_chunk(b'zTXt', b'prompt\x00\x00' + zlib.compress(b'a cat')))
+    meta = metadata.read_metadata(data)
+    assert meta.text == {'Software': 'ComfyUI', 'prompt': 'a cat'}
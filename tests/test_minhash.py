@@ -0,0 +1,34 @@
+"""
+TrustBuddy AI - Near-duplicate text index tests
+"""
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import minhash  # noqa: E402
+
+
+def test_overwritten_texts_leave_every_bucket_reachable():
+    rng = np.random.default_rng(0)
+    index = minhash.NearDuplicateTexts(capacity=8, threshold=1.0)
+    # A three-value alphabet makes band keys collide, so buckets are shared and unlinked often
+    signatures = rng.integers(0, 3, (500, minhash.NUM_PERM)).astype(np.uint32)
+    for number, signature in enumerate(signatures):
+        index.add(signature, number, key=number)
+        for band in range(minhash.BANDS):
+            table = index.buckets[band]
+            for cell in np.flatnonzero(table != minhash.EMPTY):
+                assert index._probe(index.band_keys[table[cell]])[band] == cell
+    for number in range(len(signatures) - 8, len(signatures)):
+        similarity, outcome = index.lookup(signatures[number])
+        assert similarity == 1.0
+        assert np.array_equal(signatures[outcome], signatures[number])
+
+
+def test_cost_per_text_stays_in_the_hundreds_of_bytes():
+    index = minhash.NearDuplicateTexts(capacity=50_000)
+    arrays = index.signatures.nbytes + index.band_keys.nbytes + index.buckets.nbytes + index.outcome_ids.nbytes
+    assert arrays / index.capacity < 600
@@ -0,0 +1,252 @@
+"""
+TrustBuddy AI - Text claim analysis engine
+
+The claim checks behind the Text Analyzer tab, callable without Streamlit.
+Known claims, suspicious phrases and the general-analysis boilerplate live
+in a versioned claims.json knowledge base. It is compiled once per process
+into a single TermMatcher plus a term -> claim index, and hot-reloaded
+when the file changes.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+import cache
+import config
+import instrumentation
+import minhash
+import scoring
+from matcher import TermMatcher
+
+ENGINE_VERSION = "1.3"
+
+DEFAULT_CLAIMS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'claims.json')
+
+logger = logging.getLogger(__name__)
+
+
+# ==============================
+# Knowledge base
+# ==============================
+class ClaimKnowledgeBase:
+    """An immutable, compiled snapshot of claims.json.
+
+    A claim matches when every group in its `require` list has at least one
+    of its terms in the text. Claims are tried in file order and the first
+    match decides the verdict.
+    """
+
+    def __init__(self, data, fingerprint=''):
+        for key in ('version', 'claims', 'suspicious_words', 'general_analysis'):
+            if key not in data:
+                raise ValueError(f"claim knowledge base is missing '{key}'")
+        for rule in data['claims']:
+            missing = {'id', 'require', 'trust_score', 'verdict_text', 'verdict_color', 'analysis_details'} - set(rule)
+            if missing:
+                raise ValueError(f"claim {rule.get('id', '?')!r} is missing {sorted(missing)}")
+
+        self.version = data['version']
+        self.fingerprint = f"{self.version}:{fingerprint}"
+        self.claims = data['claims']
+        self.claims_by_id = {rule['id']: rule for rule in self.claims}
+        self.suspicious_words = data['suspicious_words']
+        self.suspicious_order = {word: position for position, word in enumerate(self.suspicious_words)}
+        self.general_analysis = data['general_analysis']
+
+        terms = [term for rule in self.claims for group in rule['require'] for term in group]
+        self.matcher = TermMatcher(terms + self.suspicious_words)
+
+        # Inverted index: term -> positions of the claims that use it
+        self.rules_by_term = {}
+        for position, rule in enumerate(self.claims):
+            for group in rule['require']:
+                for term in group:
+                    self.rules_by_term.setdefault(term, set()).add(position)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as handle:
+            raw = handle.read()
+        return cls(json.loads(raw.decode('utf-8')), hashlib.sha256(raw).hexdigest()[:12])
+
+
+class KnowledgeBaseStore:
+    """Holds the current knowledge base and swaps in a new one when the file changes.
+
+    Readers just take `store.current`; a reload builds the new snapshot
+    completely before replacing the reference, so no reader ever sees a
+    half-built index. A broken file is logged and the old snapshot kept.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._current = None
+        self._mtime = None
+        self._lock = threading.Lock()
+        self._watcher = None
+
+    @property
+    def current(self):
+        if self._current is None:
+            self.reload()
+        return self._current
+
+    def reload(self):
+        """Load the file if it changed since the last load; returns True on a swap"""
+        with self._lock:
+            try:
+                mtime = os.stat(self.path).st_mtime_ns
+            except OSError:
+                if self._current is None:
+                    raise
+                logger.warning("claim knowledge base %s is unavailable, keeping version %s",
+                               self.path, self._current.fingerprint)
+                return False
+            if mtime == self._mtime:
+                return False
+            try:
+                knowledge_base = ClaimKnowledgeBase.load(self.path)
+            except (OSError, ValueError) as error:
+                if self._current is None:
+                    raise
+                logger.warning("could not reload %s (%s), keeping version %s",
+                               self.path, error, self._current.fingerprint)
+                self._mtime = mtime
+                return False
+            self._current, self._mtime = knowledge_base, mtime
+            return True
+
+    def start_watching(self, interval=2.0):
+        """Poll the file's mtime from a daemon thread and hot-reload on change"""
+        if self._watcher is not None:
+            return
+
+        def watch():
+            while True:
+                time.sleep(interval)
+                self.reload()
+
+        self._watcher = threading.Thread(target=watch, name="claims-watcher", daemon=True)
+        self._watcher.start()
+
+
+STORE = KnowledgeBaseStore(config.get_setting('claims_path') or DEFAULT_CLAIMS_PATH)
+
+
+def knowledge_base():
+    """The knowledge base snapshot currently in use"""
+    return STORE.current
+
+
+# ==============================
+# Analysis
+# ==============================
+def match_rules(text_lower, kb=None):
+    """Every rule the text satisfies, with the offsets of the terms that triggered it.
+
+    Offsets index into the lower-cased text. Returns a list of
+    {'rule', 'kind', 'matches': [(term, start, end), ...]} in rule-table order.
+    """
+    kb = kb or knowledge_base()
+    hits = {}
+    for term, start, end in kb.matcher.find_all(text_lower):
+        hits.setdefault(term, []).append((term, start, end))
+
+    # Only claims sharing at least one found term can match
+    candidates = sorted({position for term in hits for position in kb.rules_by_term.get(term, ())})
+    matched = []
+    for rule in (kb.claims[position] for position in candidates):
+        if all(any(term in hits for term in group) for group in rule['require']):
+            terms = {term for group in rule['require'] for term in group}
+            matched.append({
+                'rule': rule['id'],
+                'kind': 'claim',
+                'matches': sorted((m for term in terms for m in hits.get(term, [])), key=lambda m: m[1]),
+            })
+    for word in sorted((term for term in hits if term in kb.suspicious_order), key=kb.suspicious_order.get):
+        matched.append({'rule': word, 'kind': 'suspicious', 'matches': hits[word]})
+    return matched
+
+
+def analyze_text(text, kb=None, near_duplicates=None):
+    """Fact-check a block of text and return the verdict and supporting analysis_details.
+
+    near_duplicates is a minhash.NearDuplicateTexts. The rules always run;
+    when no claim matches and a lightly edited copy of an earlier flagged
+    text scored lower, that verdict is reused (with its similarity as
+    'near_duplicate'), so a reworded repost cannot shed it. Newly flagged
+    texts are added to the index.
+    """
+    kb = kb or knowledge_base()
+    performance = []
+    match = text_signature = None
+    if near_duplicates is not None:
+        near_duplicates.use_version((ENGINE_VERSION, kb.fingerprint, scoring.seed()))
+        with instrumentation.stage("text.near_duplicates", len(text)) as measured:
+            text_signature = minhash.signature(text)
+            match = near_duplicates.lookup(text_signature) if text_signature is not None else None
+        if measured.record is not None:
+            performance.append(measured.record)
+    with instrumentation.stage("text.match_rules", len(text)) as measured:
+        matched_rules = match_rules(text.lower(), kb)
+    if measured.record is not None:
+        performance.append(measured.record)
+    instrumentation.export_metrics()
+    # matched_rules lists claims in priority order, so the first one decides the verdict
+    first_claim = next((m['rule'] for m in matched_rules if m['kind'] == 'claim'), None)
+
+    if first_claim is not None:
+        claim_rule = kb.claims_by_id[first_claim]
+        # A well-documented false claim: detailed analysis with citations
+        trust_score = claim_rule['trust_score']
+        verdict_text = claim_rule['verdict_text']
+        verdict_color = claim_rule['verdict_color']
+        analysis_details = dict(claim_rule['analysis_details'])
+
+    else:
+        # General analysis for other claims: check for suspicious patterns
+        suspicion_score = sum(1 for m in matched_rules if m['kind'] == 'suspicious')
+
+        if suspicion_score > 0:
+            trust_score = max(20, 70 - (suspicion_score * 20))
+            verdict_text = "🟡 SUSPICIOUS CONTENT"
+            verdict_color = '#ffaa00'
+        else:
+            # No rule applies: a score in the same 60-84 band, drawn from the text itself so it is reproducible
+            trust_score = scoring.input_rng('text', cache.normalize_text(text)).integers(60, 85)
+            verdict_text = "🟢 REQUIRES VERIFICATION"
+            verdict_color = '#00ff88'
+
+        general = kb.general_analysis
+        analysis_details = {
+            'claim': 'General content analysis',
+            'verdict': 'UNVERIFIED',
+            'evidence': list(general['evidence']),
+            'citations': list(general['citations']),
+            'red_flags': [] if suspicion_score == 0 else [general['red_flag']],
+            'expert_consensus': general['expert_consensus']
+        }
+
+    result = {
+        'trust_score': int(trust_score),
+        'verdict_text': verdict_text,
+        'verdict_color': verdict_color,
+        'analysis_details': analysis_details,
+        'matched_rules': matched_rules,
+        'performance': performance,
+        'near_duplicate': None,
+    }
+    # A claim matched here is the most specific verdict; otherwise keep whichever verdict is more severe
+    if match is not None and first_claim is None and match[1]['trust_score'] < result['trust_score']:
+        similarity, outcome = match
+        result.update(outcome, analysis_details=dict(outcome['analysis_details']),
+                      near_duplicate=round(similarity, 3))
+        return result
+    # Only flagged texts are indexed: an edit that adds a red flag to a clean post must not inherit its clean verdict
+    if near_duplicates is not None and matched_rules and text_signature is not None:
+        outcome = {key: result[key] for key in ('trust_score', 'verdict_text', 'verdict_color', 'analysis_details')}
+        near_duplicates.add(text_signature, outcome, key=(first_claim, int(trust_score), verdict_text))
+    return result